@@ -28,14 +28,17 @@ bl_info = {
 from .user_interface import register_ui, unregister_ui
 from .operators import register_operators, unregister_operators
 from .rig_modules import register_bone_presets, unregister_bone_presets
+from . import warm_up
 
 def register() -> None:
     register_ui()
     register_operators()
     register_bone_presets()
+    warm_up.register_handlers()
 
 
 def unregister() -> None:
+    warm_up.unregister_handlers()
     unregister_ui()
     unregister_operators()
     unregister_bone_presets()
@@ -1,7 +1,11 @@
 from bpy.utils import register_class, unregister_class
 
 from . import op_custom_properties
-# from . import drivers_in_custom_properties
+from . import drivers_in_custom_properties
+from . import op_driver_audit
+from . import op_rig_profiler
+from . import op_instrumentation
+from . import instrumentation
 from . import op_armature_settings
 
 from . import op_import_armature_presets
@@ -10,6 +14,11 @@ from . import op_parenting_to_bones
 
 classes: list = [
     op_custom_properties.AC_OT_add_CustomProp,
+    drivers_in_custom_properties.AC_OT_add_CustomPropDrivers,
+    op_driver_audit.AC_OT_AuditDrivers,
+    op_rig_profiler.AC_OT_ProfileRig,
+    op_instrumentation.AC_OT_Instrumentation,
+    op_instrumentation.AC_OT_RedrawProfiler,
     op_armature_settings.AC_OT_Set_ArmatureProp,
     op_import_armature_presets.HumanArmaturePreset,
     op_parenting_to_bones.ParentingToBone,
@@ -22,5 +31,6 @@ def register_operators() -> None:
 
 
 def unregister_operators() -> None:
+    instrumentation.disable()
     for cls in classes:
         unregister_class(cls)
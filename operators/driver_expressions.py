@@ -0,0 +1,221 @@
+"""Checks driver expressions against Blender's simple expression evaluator.
+
+Blender evaluates a scripted driver without Python when its expression only uses
+numbers, driver variables, arithmetic, comparisons, boolean operators, the
+conditional operator and a fixed set of math functions. Anything else goes
+through the Python interpreter on every evaluation. No bpy here, it only uses ast.
+"""
+
+import ast
+
+# Function -> argument counts the simple evaluator accepts, None for one or more.
+ARITY: dict = {
+    **dict.fromkeys((
+        "radians", "degrees", "abs", "fabs", "floor", "ceil", "trunc", "round", "int",
+        "sin", "cos", "tan", "asin", "acos", "atan", "exp", "sqrt",
+    ), (1,)),
+    **dict.fromkeys(("atan2", "pow", "fmod"), (2,)),
+    **dict.fromkeys(("lerp", "smoothstep"), (3,)),
+    "log": (1, 2),
+    "clamp": (1, 3),
+    "min": None,
+    "max": None,
+}
+FUNCTIONS: frozenset = frozenset(ARITY)
+CONSTANTS: frozenset = frozenset({"pi", "True", "False"})
+BUILTIN_VARIABLES: frozenset = frozenset({"frame"})
+
+_OPERATORS: tuple = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_UNARY: tuple = (ast.UAdd, ast.USub, ast.Not)
+_COMPARISONS: tuple = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+# Nodes without checks of their own, operators are checked with their expression.
+_ALLOWED: tuple = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.IfExp,
+    ast.expr_context, ast.operator, ast.unaryop, ast.cmpop, ast.boolop,
+)
+
+
+def _arity_matches(function: str, count: int) -> bool:
+    counts = ARITY[function]
+    return count >= 1 if counts is None else count in counts
+
+
+def _check(node: ast.AST, names: set, problems: list) -> None:
+    """Adds the problems of node to problems. Unsupported nodes are reported once,
+    without their children."""
+
+    if isinstance(node, ast.Name):
+        if node.id in FUNCTIONS and node.id not in names:
+            problems.append(f"function '{node.id}' used as a value")
+        elif node.id not in names:
+            problems.append(f"unknown name '{node.id}'")
+        return
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            problems.append(f"call to '{ast.unparse(node.func)}'")
+        elif node.keywords:
+            problems.append(f"keyword arguments in '{node.func.id}'")
+        elif not _arity_matches(node.func.id, len(node.args)):
+            problems.append(f"'{node.func.id}' called with {len(node.args)} arguments")
+        for arg in node.args:
+            _check(arg, names, problems)
+        return
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, str) or not isinstance(node.value, (int, float)):
+            problems.append(f"constant {node.value!r}")
+        return
+    if isinstance(node, ast.Attribute):
+        problems.append(f"attribute access '{ast.unparse(node)}'")
+        return
+    if isinstance(node, ast.Subscript):
+        problems.append(f"subscript '{ast.unparse(node)}'")
+        return
+
+    if isinstance(node, ast.BinOp) and not isinstance(node.op, _OPERATORS):
+        problems.append(f"operator '{type(node.op).__name__}'")
+    elif isinstance(node, ast.UnaryOp) and not isinstance(node.op, _UNARY):
+        problems.append(f"operator '{type(node.op).__name__}'")
+    elif isinstance(node, ast.Compare):
+        problems += [f"comparison '{type(op).__name__}'" for op in node.ops if not isinstance(op, _COMPARISONS)]
+    elif not isinstance(node, _ALLOWED):
+        problems.append(f"'{type(node).__name__}' expression")
+        return
+
+    for child in ast.iter_child_nodes(node):
+        _check(child, names, problems)
+
+
+def simple_expression_problems(expression: str, variables: tuple = ()) -> list:
+    """Reasons why expression can't use the simple expression evaluator, empty if it can.
+
+    :param variables: names of the driver variables.
+    """
+
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as error:
+        return [f"syntax error: {error.msg}"]
+
+    problems: list = []
+    _check(tree, set(variables) | BUILTIN_VARIABLES | CONSTANTS, problems)
+    return problems
+
+
+def is_simple_expression(expression: str, variables: tuple = ()) -> bool:
+    return not simple_expression_problems(expression, variables)
+
+
+# Module prefixes legacy drivers use for functions the simple evaluator has.
+MODULES: frozenset = frozenset({"math", "numpy", "np"})
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Rewrites the common Python only patterns into simple expression forms."""
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        # math.pi -> pi
+        if isinstance(node.value, ast.Name) and node.value.id in MODULES and node.attr == "pi":
+            return ast.copy_location(ast.Name(id="pi", ctx=ast.Load()), node)
+        return self.generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        # a ** b -> pow(a, b)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node
+            )
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        func = node.func
+        # math.sin(x) -> sin(x), np.clip(x, a, b) -> clamp(x, a, b)
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in MODULES:
+            func = ast.Name(id=func.attr, ctx=ast.Load())
+        if not isinstance(func, ast.Name) or node.keywords:
+            return node
+
+        name = func.id
+        if name == "clip" and len(node.args) == 3:
+            name = "clamp"
+        elif name in ("float", "bool") and len(node.args) == 1:
+            # float(x) -> x, bool(x) -> x != 0
+            arg = node.args[0]
+            if name == "float":
+                return arg
+            return ast.copy_location(ast.Compare(left=arg, ops=[ast.NotEq()], comparators=[ast.Constant(0)]), node)
+        elif name == "interp" and len(node.args) == 3:
+            # interp(t, [x0, x1], [y0, y1]) -> lerp(y0, y1, clamp((t - x0) / (x1 - x0)))
+            t, xs, ys = node.args
+            if isinstance(xs, (ast.List, ast.Tuple)) and isinstance(ys, (ast.List, ast.Tuple)) and len(xs.elts) == len(ys.elts) == 2:
+                x0, x1 = xs.elts
+                y0, y1 = ys.elts
+                factor = ast.BinOp(
+                    left=ast.BinOp(left=t, op=ast.Sub(), right=x0),
+                    op=ast.Div(),
+                    right=ast.BinOp(left=x1, op=ast.Sub(), right=x0),
+                )
+                clamped = ast.Call(func=ast.Name(id="clamp", ctx=ast.Load()), args=[factor], keywords=[])
+                return ast.copy_location(
+                    ast.Call(func=ast.Name(id="lerp", ctx=ast.Load()), args=[y0, y1, clamped], keywords=[]), node
+                )
+            return node
+
+        if name not in FUNCTIONS:
+            return node
+        return ast.copy_location(ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=node.args, keywords=[]), node)
+
+
+def rewrite_expression(expression: str, variables: tuple = ()) -> str | None:
+    """Simple expression equivalent of expression, None if there is no known rewrite.
+
+    Handles module prefixes (math.sin -> sin), powers (a ** b -> pow(a, b)), clamps
+    (clip -> clamp), float and bool conversions and two point linear blends
+    (interp(t, [x0, x1], [y0, y1]) -> lerp). The result goes through the same checks
+    as any expression, argument counts included, so a rewrite the simple evaluator
+    wouldn't take gives None.
+    """
+
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError:
+        return None
+    rewritten = ast.unparse(ast.fix_missing_locations(_Rewriter().visit(tree)))
+    if rewritten == ast.unparse(ast.parse(expression.strip(), mode="eval")):
+        return None
+    if simple_expression_problems(rewritten, variables):
+        return None
+    return rewritten
+
+
+def single_variable(expression: str, variables: tuple) -> str | None:
+    """Name of the only variable when expression is just that variable, the driver can
+    then be an Averaged Value driver that skips expressions."""
+
+    if len(variables) != 1:
+        return None
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError:
+        return None
+    if isinstance(tree.body, ast.Name) and tree.body.id == variables[0]:
+        return variables[0]
+    return None
+
+
+def estimate_cost(expression: str, variables: tuple = (), use_self: bool = False) -> float:
+    """Rough evaluation cost of a scripted driver, a simple expression costs 1.
+
+    Python drivers pay for the interpreter call and the namespace setup on every
+    evaluation, then per node of the expression; use_self also builds the self
+    wrapper. Only meant to rank drivers against each other.
+    """
+
+    if not use_self and is_simple_expression(expression, variables):
+        return 1.0
+    try:
+        nodes = sum(1 for _ in ast.walk(ast.parse(expression.strip(), mode="eval")))
+    except SyntaxError:
+        nodes = 0
+    return 20.0 + 2.0 * nodes + (20.0 if use_self else 0.0)
@@ -1,63 +1,238 @@
-from bpy.types import Context, Operator
-
-from bpy import context
-
-
-######TO DO####
-def add_bone_constraints_drivers(
-    source_bone: str,
-    constraints_name: str,
-    constraint_property: str,
-    target_bone_property_name: str,
-    target_datapath: str,
-    context: Context,
-    driver_type: str,
-    bone_driver_expression: str,
-    variable_type="SINGLE_PROP",
-):
-
-    add_driver = (
-        context.active_object.pose.bones[source_bone]
-        .constraints[constraints_name]
-        .driver_add(constraint_property)
-    )
-    add_driver.driver.variables.new().name
-    add_driver.driver.type = driver_type
-    expression: str = ""
-    add_driver.type.expression
-
-    bone_driver = (
-        context.active_object.active_object.pose.bones[source_bone]
-        .constraints[constraints_name]
-        .driver_add(constraint_property)
-        .driver.variables.new()
-    )
-    bone_driver.name = target_bone_property_name  # custom_bone_name
-    bone_driver.type = variable_type
-    bone_driver.targets[0].id = context  # target
-    bone_driver.targets[0].data_path = target_datapath  # datapath
-
-    context.active_object.active_object.pose.bones[source_bone].constraints[
-        constraints_name
-    ].driver_add(constraint_property).driver.type = driver_type
-    bone_driver_expression_source_bone = (
-        context.active_object.pose.bones[source_bone]
-        .constraints[constraints_name]
-        .driver_add(constraint_property)
-        .driver
-    )
-    bone_driver_expression_source_bone.expression = bone_driver_expression
-
-    # -------------------------------------------------------------
-    fcurve = (
-        context.active_object.pose.bones["Bone"]
-        .constraints["Copy Location"]
-        .driver_add("influence")
-    )
+from pathlib import Path
+import json
+from bpy.types import Context, Object, Operator
+from bpy.props import StringProperty
+import bpy
+from . import driver_expressions
+
+MAPPING_PATH = Path(__file__).parent.parent / 'armature_presets' / 'driver_mapping.json'
+MAPPING_KEYS = {"sides", "variables", "bones", "constraint", "collections", "path", "expression"}
+# Driven property when the entry doesn't give a path.
+DEFAULT_PATHS = {"constraint": "influence", "collection": "is_visible"}
+
+# Resolved mapping path -> (modification time, validated entries).
+_mapping_cache: dict = {}
+
+
+def validate_mapping(mapping: dict, path: str = '') -> tuple:
+    """Checks a driver mapping, returns its entries.
+
+    Every expression has to qualify for Blender's simple expression evaluator.
+
+    :raises ValueError: with the file, the entry and what is wrong with it.
+    """
+
+    drivers = mapping.get("drivers") if isinstance(mapping, dict) else None
+    if not isinstance(drivers, list):
+        raise ValueError(f"'{path}': expects a 'drivers' list")
+
+    entries: list = []
+    for index, entry in enumerate(drivers):
+        where = f"'{path}' driver {index}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expects an object, not {type(entry).__name__}")
+        unknown = set(entry) - MAPPING_KEYS
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+
+        variables = entry.get("variables")
+        if not isinstance(variables, dict) or not variables:
+            raise ValueError(f"{where}: 'variables' must map variable names to custom properties")
+        for name, prop in variables.items():
+            if not name.isidentifier() or not isinstance(prop, str) or not prop:
+                raise ValueError(f"{where}: variable '{name}' must be a name with a custom property")
+
+        if ("bones" in entry) == ("collections" in entry):
+            raise ValueError(f"{where}: needs either 'bones' and 'constraint' or 'collections'")
+        if "bones" in entry and not isinstance(entry.get("constraint"), str):
+            raise ValueError(f"{where}: 'bones' needs a 'constraint' name")
+        targets = entry.get("bones", entry.get("collections"))
+        if not isinstance(targets, list) or not all(isinstance(target, str) for target in targets):
+            raise ValueError(f"{where}: 'bones' or 'collections' must be a list of names")
+
+        sides = entry.get("sides", [""])
+        if not isinstance(sides, list) or not all(isinstance(side, str) for side in sides):
+            raise ValueError(f"{where}: 'sides' must be a list of suffixes like '.L'")
+
+        expression = entry.get("expression")
+        if not isinstance(expression, str):
+            raise ValueError(f"{where}: 'expression' must be a string")
+        problems = driver_expressions.simple_expression_problems(expression, tuple(variables))
+        if problems:
+            raise ValueError(f"{where}: '{expression}' is not a simple expression ({', '.join(problems)})")
+
+        kind = "constraint" if "bones" in entry else "collection"
+        entries.append(dict(
+            kind=kind,
+            targets=tuple(targets),
+            constraint=entry.get("constraint"),
+            path=entry.get("path", DEFAULT_PATHS[kind]),
+            sides=tuple(sides),
+            variables=dict(variables),
+            expression=expression,
+        ))
+    return tuple(entries)
+
+
+def load_mapping(path: str | Path | None = None) -> tuple:
+    """Entries of a JSON driver mapping, parsed and validated once per file version.
+
+    :param path: mapping file, defaults to MAPPING_PATH.
+    """
+
+    path = Path(bpy.path.abspath(str(path))) if path else MAPPING_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        raise ValueError(f"Driver mapping '{path}' not found")
+
+    cached = _mapping_cache.get(str(path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        mapping = json.loads(path.read_text())
+    except json.JSONDecodeError as error:
+        raise ValueError(f"'{path}' is not valid JSON: {error}")
+    entries = validate_mapping(mapping, str(path))
+    _mapping_cache[str(path)] = (mtime, entries)
+    return entries
+
+
+def driver_specs(entries: tuple) -> list:
+    """One spec per driven property, with '{suffix}' and '{side}' filled for every side.
+
+    '{suffix}' is the side as given ('.L'), '{side}' without the dot ('L').
+    """
+
+    specs: list = []
+    for entry in entries:
+        for suffix in entry["sides"]:
+            fields = dict(suffix=suffix, side=suffix.lstrip('.'))
+            variables = {name: prop.format(**fields) for name, prop in entry["variables"].items()}
+            for target in entry["targets"]:
+                specs.append(dict(
+                    kind=entry["kind"],
+                    target=target.format(**fields),
+                    constraint=entry["constraint"],
+                    path=entry["path"],
+                    variables=variables,
+                    expression=entry["expression"],
+                ))
+    return specs
+
+
+def add_driver(owner, path: str, expression: str, variables: dict, target: Object):
+    """Drives owner.path with a scripted expression of single property variables.
+
+    Re-running it replaces the variables and expression of the existing driver.
+
+    :param variables: variable name -> data path on target.
+    """
+
+    fcurve = owner.driver_add(path)
     driver = fcurve.driver
+    driver.type = 'SCRIPTED'
+    driver.use_self = False
+    while driver.variables:
+        driver.variables.remove(driver.variables[0])
+    for name, data_path in variables.items():
+        variable = driver.variables.new()
+        variable.name = name
+        variable.type = 'SINGLE_PROP'
+        variable.targets[0].id_type = 'OBJECT'
+        variable.targets[0].id = target
+        variable.targets[0].data_path = data_path
+    driver.expression = expression
+    return fcurve
+
+
+def add_bone_constraints_drivers(specs: list, source_bone: str, context: Context) -> dict:
+    """Connects the custom properties of source_bone to constraints and bone collections.
+
+    :param specs: from driver_specs.
+    :return: number of 'created' drivers and the 'missing' targets or properties.
+    :rtype: dict
+    """
+
+    armature = context.active_object
+    pose_bones = armature.pose.bones
+    properties = set(pose_bones[source_bone].keys())
+    # collections only lists the root bone collections, collections_all nested ones too.
+    collections = {col.name: col for col in armature.data.collections_all}
+    result = {"created": 0, "missing": []}
+
+    for spec in specs:
+        missing = [prop for prop in spec["variables"].values() if prop not in properties]
+        if missing:
+            result["missing"] += [f"property '{prop}'" for prop in missing]
+            continue
+
+        if spec["kind"] == "constraint":
+            bone = pose_bones.get(spec["target"])
+            owner = bone.constraints.get(spec["constraint"]) if bone else None
+            if owner is None:
+                result["missing"].append(f"constraint '{spec['constraint']}' of '{spec['target']}'")
+                continue
+        else:
+            owner = collections.get(spec["target"])
+            if owner is None:
+                result["missing"].append(f"bone collection '{spec['target']}'")
+                continue
+
+        variables = {
+            name: f'pose.bones["{bpy.utils.escape_identifier(source_bone)}"]["{bpy.utils.escape_identifier(prop)}"]'
+            for name, prop in spec["variables"].items()
+        }
+        add_driver(owner, spec["path"], spec["expression"], variables, armature)
+        result["created"] += 1
+
+    result["missing"] = list(dict.fromkeys(result["missing"]))
+    return result
+
+
+class AC_OT_add_CustomPropDrivers(Operator):
+    """Drives constraints and bone collection visibility with the custom properties of a source bone"""
+
+    bl_idname = "rigtoolkit.set_custom_property_drivers"
+    bl_label = "Custom Property Drivers"
+    bl_options = {"REGISTER", "UNDO"}
+
+    source_bone_name: StringProperty(
+        name='Properties',
+        description='Bone name in which custom properties are stored.',
+        default='Properties',
+    ) # type: ignore
+    mapping_path: StringProperty(
+        name='Mapping',
+        description='JSON file with the drivers, the bundled mapping if empty.',
+        default='',
+        subtype='FILE_PATH',
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        if hasattr(context.active_object, "type"):
+            return context.active_object.type == "ARMATURE"
+        return False
+
+    def execute(self, context):
+        source_bone = self.source_bone_name
+        if not context.active_object.pose.bones.get(source_bone):
+            self.report({"ERROR"}, f"There is no bone named '{source_bone}'")
+            return {"CANCELLED"}
+
+        try:
+            specs = driver_specs(load_mapping(self.mapping_path))
+        except ValueError as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
 
-    driver.expression = "var"
+        result = add_bone_constraints_drivers(specs, source_bone, context)
+        if result["missing"]:
+            shown = ', '.join(result["missing"][:5])
+            more = f" and {len(result['missing']) - 5} more" if len(result["missing"]) > 5 else ""
+            self.report({"WARNING"}, f"Skipped, not found: {shown}{more}")
 
-    variables_driver = driver.variables.new()
-    variables_driver.targets[0].id = context.active_object
-    variables_driver.targets[0].data_path = 'pose.bones["Bone"]["prop"]'
+        self.report({"INFO"}, f"{result['created']} drivers added from '{source_bone}' bone")
+        return {"FINISHED"}
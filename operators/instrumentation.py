@@ -0,0 +1,142 @@
+"""Timing of the rig helpers and operators, switched on for the session.
+
+enable() wraps every function of rig_modules.set_bone and rig_modules.set_bcontraints,
+the plan passes and mode switches, and the execute of every toolkit operator. Each
+operator run appends a JSON line to the log with the armature, its bone counts and the
+calls made during the run. disable() puts the original functions back, so nothing is
+timed, or slowed down, while it is off.
+"""
+
+from pathlib import Path
+import functools
+import inspect
+import json
+import tempfile
+import time
+from ..rig_modules import apply_plan
+from ..rig_modules import mode_passes
+from ..rig_modules import set_bcontraints
+from ..rig_modules import set_bone
+
+LOG_PATH = Path(tempfile.gettempdir()) / "rigtoolkit_instrumentation.jsonl"
+MODULES: tuple = (set_bone, set_bcontraints)
+# Extra functions timed as (owner, attribute name).
+EXTRA: tuple = (
+    (apply_plan, "apply_edit"),
+    (apply_plan, "apply_pose"),
+    (mode_passes.ModePasses, "run"),
+)
+
+# Call name -> [count, seconds].
+calls: dict = {}
+# (owner, attribute name) -> original function.
+_originals: dict = {}
+_log_path: Path = LOG_PATH
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def current_log() -> Path:
+    return _log_path
+
+
+def _timed(name: str, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry = calls.get(name)
+            if entry is None:
+                entry = calls[name] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+    return wrapper
+
+
+def _bone_count(obj) -> int | None:
+    if getattr(obj, "type", None) != "ARMATURE":
+        return None
+    if obj.mode == "EDIT":
+        return len(obj.data.edit_bones)
+    return len(obj.data.bones)
+
+
+def _timed_execute(cls, func):
+    @functools.wraps(func)
+    def execute(self, context):
+        armature = context.active_object
+        bones_before = _bone_count(armature)
+        before = {name: tuple(entry) for name, entry in calls.items()}
+        start = time.perf_counter()
+        result = func(self, context)
+        seconds = time.perf_counter() - start
+
+        run_calls = {}
+        for name, (count, total) in calls.items():
+            old_count, old_total = before.get(name, (0, 0.0))
+            if count > old_count:
+                run_calls[name] = {"count": count - old_count, "seconds": total - old_total}
+        record = dict(
+            time=time.time(),
+            operator=cls.bl_idname,
+            armature=getattr(armature, "name", None),
+            bones_before=bones_before,
+            bones_after=_bone_count(armature),
+            seconds=seconds,
+            result=sorted(result),
+            calls=run_calls,
+        )
+        with open(_log_path, "a") as log:
+            log.write(json.dumps(record) + "\n")
+        return result
+    return execute
+
+
+def _patch(owner, attr: str, wrapped) -> None:
+    _originals[(owner, attr)] = owner.__dict__[attr]
+    setattr(owner, attr, wrapped)
+
+
+def enable(operator_classes: list, log_path: str | Path | None = None) -> None:
+    """Starts timing. Operator classes get their execute wrapped.
+
+    :param log_path: JSON lines log, defaults to LOG_PATH.
+    """
+
+    global _log_path
+    if is_enabled():
+        disable()
+    _log_path = Path(log_path) if log_path else LOG_PATH
+    calls.clear()
+
+    for module in MODULES:
+        for attr, func in list(vars(module).items()):
+            if inspect.isfunction(func) and func.__module__ == module.__name__:
+                _patch(module, attr, _timed(f"{module.__name__.rsplit('.', 1)[-1]}.{attr}", func))
+    for owner, attr in EXTRA:
+        _patch(owner, attr, _timed(f"{owner.__name__.rsplit('.', 1)[-1]}.{attr}", owner.__dict__[attr]))
+    for cls in operator_classes:
+        if "execute" in cls.__dict__:
+            _patch(cls, "execute", _timed_execute(cls, cls.__dict__["execute"]))
+
+
+def disable() -> None:
+    """Puts the original functions back."""
+
+    for (owner, attr), func in _originals.items():
+        setattr(owner, attr, func)
+    _originals.clear()
+
+
+def summary() -> list:
+    """(name, count, seconds) of the calls timed so far, slowest first."""
+
+    return sorted(
+        ((name, count, seconds) for name, (count, seconds) in calls.items()),
+        key=lambda item: item[2],
+        reverse=True,
+    )
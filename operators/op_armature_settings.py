@@ -1,6 +1,7 @@
 from bpy.types import Context, Operator
-from bpy import ops
+from bpy.props import BoolProperty
 import bpy
+from ..rig_modules import mode_passes
 
 
 def set_name(armature, context: Context):
@@ -11,7 +12,7 @@ def set_name(armature, context: Context):
     return armature.name
 
 class AC_OT_Set_ArmatureProp(Operator):
-    """Setting properties and naming convention for active Armature object"""
+    """Setting properties and naming convention for active and selected Armature objects"""
 
     bl_idname = "rigtoolkit.set_armature_properties"
     bl_label = "Armature Property Settings"
@@ -25,49 +26,76 @@ class AC_OT_Set_ArmatureProp(Operator):
         # return context.active_object.type == "ARMATURE"
         # return context.active_object.type == "ARMATURE" and context.area.type == 'VIEW_3D'
     
-    @staticmethod
-    def set_armature_collection(context: Context):
-        if not context.mode == "OBJECT":
-            ops.object.mode_set(mode="OBJECT")
-
-        armature = bpy.context.active_object
-        armature.name = set_name(armature, context)
-        armature_mstr = armature.name.replace('RIG', 'MASTER')
-        armature_obj = armature.name.replace('RIG', 'OBJECTS')
-        armature_widget = armature.name.replace('RIG', 'WIDGET')
+    selected: BoolProperty(
+        name="Selected Armatures",
+        description="Apply the settings to every selected armature, not only the active one",
+        default=True,
+    )  # type: ignore
+
+    def armatures(self, context: Context) -> list:
+        """Active armature first, then the other selected armatures."""
+
+        armatures = [context.active_object]
+        if self.selected:
+            armatures += [
+                obj for obj in context.selected_objects
+                if obj.type == "ARMATURE" and obj != context.active_object
+            ]
+        return armatures
 
-        if armature_mstr not in context.scene.collection.children.keys():
+    @staticmethod
+    def set_armature_collection(armatures: list, context: Context):
+        """Moves each armature into its MASTER/RIG collection, next to OBJECTS and WIDGET.
+
+        Collections are looked up in a name index built once and missing links are
+        collected first and made together.
+        """
+
+        collections = {col.name: col for col in bpy.data.collections}
+        children: dict = {context.scene.collection: set(context.scene.collection.children.keys())}
+        scene_objects = set(context.scene.collection.objects.keys())
+        links: list = []
+        object_links: list = []
+
+        def get_collection(name: str, parent, hide: bool = False) -> bpy.types.Collection:
+            col = collections.get(name)
+            if col is None:
+                col = collections[name] = bpy.data.collections.new(name)
+                col.hide_viewport = hide
+            parent_children = children.get(parent)
+            if parent_children is None:
+                parent_children = children[parent] = set(parent.children.keys())
+            if name not in parent_children:
+                parent_children.add(name)
+                links.append((parent, col))
+            return col
+
+        for armature in armatures:
+            armature.name = set_name(armature, context)
             #Master Collection
-            mstrcoll = bpy.data.collections.new(f'{armature_mstr}')
-            context.scene.collection.children.link(mstrcoll)
-
-        if armature.name not in bpy.data.collections[armature_mstr].children.keys():
+            mstrcoll = get_collection(armature.name.replace('RIG', 'MASTER'), context.scene.collection)
             #Object Collection
-            objcoll = bpy.data.collections.new(f'{armature_obj}')
-            bpy.data.collections[armature_mstr].children.link(objcoll)
+            get_collection(armature.name.replace('RIG', 'OBJECTS'), mstrcoll)
             #Rig Collection.
-            coll = bpy.data.collections.new(f'{armature.name}')
-            bpy.data.collections[armature_mstr].children.link(coll)
+            coll = get_collection(armature.name, mstrcoll)
             #Widget Collection.
-            wgtcoll = bpy.data.collections.new(f'{armature_widget}')
-            bpy.data.collections[armature_mstr].children.link(wgtcoll)
-            bpy.data.collections[armature_widget].hide_viewport = True
+            get_collection(armature.name.replace('RIG', 'WIDGET'), mstrcoll, hide=True)
 
-        if armature in bpy.data.collections[armature.name].objects.values():
-            return {'FINISHED'}
-        
-        bpy.data.collections[armature.name].objects.link(armature)
-        context.scene.collection.objects.unlink(armature)
+            if armature.name not in coll.objects:
+                object_links.append((coll, armature))
+
+        for parent, col in links:
+            parent.children.link(col)
+        for col, armature in object_links:
+            col.objects.link(armature)
+            if armature.name in scene_objects:
+                context.scene.collection.objects.unlink(armature)
+        return {'FINISHED'}
 
     @staticmethod
-    def set_object_data(context: Context,):
+    def set_object_data(armature, context: Context,):
         """Sets object data, it returns armature name"""
 
-        armature = context.active_object
-
-        if not context.mode == "EDIT":
-            ops.object.mode_set(mode="EDIT")
-
         # Armature name.
         armature.name = set_name(armature, context)
 
@@ -84,14 +112,10 @@ class AC_OT_Set_ArmatureProp(Operator):
         return {"FINISHED"}
 
     @staticmethod
-    def set_armature_data(context: Context):
+    def set_armature_data(armature, context: Context):
         """It sets viewport display data for armatures object."""
-                
-        if not context.mode == "POSE":
-            ops.object.mode_set(mode="POSE")
 
         # Copy object name into data name.
-        armature = bpy.context.active_object
         armature.data.name = f'{armature.name.replace(" ", "_").replace("RIG","DATA").strip().lower()}'
 
         # Viewport Display data settings.
@@ -106,9 +130,13 @@ class AC_OT_Set_ArmatureProp(Operator):
         return {"FINISHED"}
 
     def execute(self, context):
-        self.set_armature_collection(context)        
-        self.set_object_data(context)
-        self.set_armature_data(context)
-
-        self.report({"INFO"}, f"Armature Settings Apply")
+        # None of the settings need a mode, the armature only ends in Pose Mode.
+        armatures = self.armatures(context)
+        self.set_armature_collection(armatures, context)
+        for armature in armatures:
+            self.set_object_data(armature, context)
+            self.set_armature_data(armature, context)
+        mode_passes.end_in(context, "POSE")
+
+        self.report({"INFO"}, f"Armature Settings Apply to {len(armatures)} armatures")
         return {"FINISHED"}
@@ -1,121 +1,138 @@
 from bpy.types import Context, Operator
 from bpy.props import StringProperty
+from pathlib import Path
+import json
 import rna_prop_ui
 import bpy
 
-def all_custom_properties(bone_properties: str) -> dict:
+SCHEMA_PATH = Path(__file__).parent.parent / 'armature_presets' / 'custom_properties.json'
+SUFFIXES = (".L", ".R", ".C", ".top", ".bot")
+SCHEMA_KEYS = {"name", "default", "suffix", "min", "max"}
+
+# Resolved schema path -> (modification time, validated property entries).
+_schema_cache: dict = {}
+
+
+def validate_schema(schema: dict, path: str = '') -> tuple:
+    """Checks a custom property schema, returns its property entries.
+
+    :raises ValueError: with the file, the entry and what is wrong with it.
+    """
+
+    properties = schema.get("properties") if isinstance(schema, dict) else None
+    if not isinstance(properties, list):
+        raise ValueError(f"'{path}': expects a 'properties' list")
+
+    entries: list = []
+    seen: set = set()
+    for index, entry in enumerate(properties):
+        where = f"'{path}' property {index}"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{where}: expects an object, not {type(entry).__name__}")
+        unknown = set(entry) - SCHEMA_KEYS
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+        name = entry.get("name")
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"{where}: 'name' must be a non empty string")
+        default = entry.get("default")
+        if not isinstance(default, (str, float, int, bool)):
+            raise ValueError(f"{where} '{name}': 'default' must be a string, number or boolean")
+        suffix = entry.get("suffix")
+        if suffix is not None and suffix not in SUFFIXES:
+            raise ValueError(f"{where} '{name}': 'suffix' must be one of {', '.join(SUFFIXES)}")
+        for key in ("min", "max"):
+            if key in entry and (isinstance(entry[key], bool) or not isinstance(entry[key], (float, int))):
+                raise ValueError(f"{where} '{name}': '{key}' must be a number")
+
+        names = is_suffix_in_custom_prop(name, suffix)
+        for full_name in names if isinstance(names, tuple) else (names,):
+            if full_name in seen:
+                raise ValueError(f"{where}: '{full_name}' is defined twice")
+            seen.add(full_name)
+
+        entries.append(dict(
+            prop_name=name,
+            default=default,
+            suffix=suffix,
+            min_value=entry.get("min", 0.0),
+            max_value=entry.get("max", 1.0),
+        ))
+    return tuple(entries)
+
+
+def load_schema(path: str | Path | None = None) -> tuple:
+    """Property entries of a JSON schema file, parsed and validated once per file version.
+
+    :param path: schema file, defaults to SCHEMA_PATH.
+    """
+
+    path = Path(bpy.path.abspath(str(path))) if path else SCHEMA_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        raise ValueError(f"Custom property schema '{path}' not found")
+
+    cached = _schema_cache.get(str(path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        schema = json.loads(path.read_text())
+    except json.JSONDecodeError as error:
+        raise ValueError(f"'{path}' is not valid JSON: {error}")
+    entries = validate_schema(schema, str(path))
+    _schema_cache[str(path)] = (mtime, entries)
+    return entries
+
+
+def all_custom_properties(bone_properties: str, path: str | Path | None = None) -> list:
     """Stores all the custom properties that would get call.
 
-    :return: return a dictionary with all custom properties.
-    :rtype: dict
+    :param path: schema file, defaults to SCHEMA_PATH.
+    :return: return a list with all custom properties.
+    :rtype: list
     """
-    # ---------- Custom Property Settings ----------
-    mouth_zipper = CustomPropertiesAccess(
-        prop_name="mouth-zipper", source_bone=bone_properties, default=1.0, max_value=5.0
-    )
-    teeth_follow_rot = CustomPropertiesAccess(
-        prop_name="teeth-follow_rot", source_bone=bone_properties, default=1.0
-    )
-    eyes_sticky_eyelips = CustomPropertiesAccess(
-        prop_name="eyes-sticky_eyelips", source_bone=bone_properties, default=1.0
-    )
-    foot_roll = CustomPropertiesAccess(
-        prop_name="Foot Roll", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    arm_fk_hinge = CustomPropertiesAccess(
-        prop_name="arm-FK_hinge", source_bone=bone_properties, default=1.0, suffix=".R"
-    )
-    leg_fk_hinge = CustomPropertiesAccess(
-        prop_name="leg-FK_hinge", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    arm_ik_pole_follow = CustomPropertiesAccess(
-        prop_name="arm-IK_pole_follow",
-        source_bone=bone_properties,
-        default=1.0,
-        suffix=".L",
-    )
-    leg_ik_pole_follow = CustomPropertiesAccess(
-        prop_name="leg-IK_pole_follow",
-        source_bone=bone_properties,
-        default=1.0,
-        suffix=".L",
-    )
-    arm_ik_stretch = CustomPropertiesAccess(
-        prop_name="arm-IK_stretch", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    leg_ik_stretch = CustomPropertiesAccess(
-        prop_name="leg-IK_stretch", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    arm_ik_fk_switch = CustomPropertiesAccess(
-        prop_name="arm-IK|FK", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    leg_ik_fk_switch = CustomPropertiesAccess(
-        prop_name="leg-IK|FK", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    arm_rubber_hose = CustomPropertiesAccess(
-        prop_name="arm-rubber_hose", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-    leg_rubber_hose = CustomPropertiesAccess(
-        prop_name="leg-rubber_hose", source_bone=bone_properties, default=1.0, suffix=".L"
-    )
-
-    # ---------- Character Settings ----------
-    arm_mask = CustomPropertiesAccess(
-        prop_name="arm-mask", source_bone=bone_properties, default=False, suffix=".L"
-    )
-    leg_mask = CustomPropertiesAccess(
-        prop_name="leg-mask", source_bone=bone_properties, default=False, suffix=".L"
-    )
-
-    all_props = {
-        foot_roll,
-        arm_fk_hinge,
-        leg_fk_hinge,
-        arm_ik_pole_follow,
-        arm_ik_pole_follow,
-        leg_ik_pole_follow,
-        arm_ik_stretch,
-        leg_ik_stretch,
-        arm_ik_fk_switch,
-        leg_ik_fk_switch,
-        arm_rubber_hose,
-        leg_rubber_hose,
-        arm_mask,
-        leg_mask,
-        mouth_zipper,
-        teeth_follow_rot,
-        eyes_sticky_eyelips,
-    }
-
-    return all_props
-
-
-def properties_to_ui(all_custom_props: set, context: Context) -> None:
-    """Takes the dictionary of custom properties and creates them in the 'Properties' bone custom properties panel.
-
-    :param all_custom_props: A set of dictionary of custom properties.
-    :type all_custom_props: set
+
+    return [CustomPropertiesAccess(source_bone=bone_properties, **entry) for entry in load_schema(path)]
+
+
+def properties_to_ui(all_custom_props: list, context: Context) -> int:
+    """Takes the custom properties and creates the missing ones in the 'Properties' bone custom properties panel.
+
+    The keys of each source bone are read once, missing properties are collected
+    first and created together.
+
+    :param all_custom_props: custom properties from all_custom_properties.
+    :type all_custom_props: list
     :param context: context.active_object
     :type context: Context
-    :return: None
-    :rtype: None
+    :return: number of properties created.
+    :rtype: int
     """
+    existing: dict = {}
+    missing: dict = {}
     for custom_property in all_custom_props:
+        source_bone = custom_property.source_bone
+        if source_bone not in existing:
+            existing[source_bone] = set(context.active_object.pose.bones[source_bone].keys())
+
         proper_dict = make_dict_pairs(
             nameprop=custom_property.prop_name,
             default=custom_property.default,
-            source_bone=custom_property.source_bone,
+            source_bone=source_bone,
             suffix=custom_property.suffix,
             context=context,
             min_value=custom_property.min,
             max_value=custom_property.max,
+            existing=existing[source_bone],
         )
-
         if proper_dict:
-            for key in proper_dict:
-                rna_prop_ui.rna_idprop_ui_create(overridable=True, **proper_dict[key])
+            missing.update(proper_dict)
 
-    return {"FINISHED"}
+    for key in missing:
+        rna_prop_ui.rna_idprop_ui_create(overridable=True, **missing[key])
+    return len(missing)
 
 def make_dict_pairs(
     nameprop: str,
@@ -125,6 +142,7 @@ def make_dict_pairs(
     min_value: float | int,
     max_value: float | int,
     suffix: str | None = None,
+    existing: set | None = None,
 ) -> dict:
     """Return a dictionary with custom properties. If suffix paramater is given returns a pair of prop L, R or top, bot.
 
@@ -138,39 +156,29 @@ def make_dict_pairs(
     :type context: Context
     :param suffix: '.L', '.R', '.C', '.top', '.bot', defaults to None
     :type suffix: str | None, optional
-    :return: dictionary with custom properties
+    :param existing: keys of the source bone, read from the bone if not given.
+    :type existing: set | None, optional
+    :return: dictionary with the custom properties the bone doesn't have yet
     :rtype: dict
     """    
 
-    # Might not be neccessary, but keep it for now.
-    # assert is_bone(source_bone, context), f"'{source_bone}' bone not in active Armature." 
+    pose_bone = context.active_object.pose.bones[source_bone]
+    if existing is None:
+        existing = set(pose_bone.keys())
 
     full_name = is_suffix_in_custom_prop(prop_name=nameprop, suffix_side=suffix)
     dict_customprop = {}
 
-    if isinstance(full_name, tuple):
-        for name in full_name:
-            if name in context.active_object.pose.bones[source_bone].keys():
-                continue
-            dict_customprop[name] = dict(
-                item=context.active_object.pose.bones[source_bone],
-                prop=name,
-                default=default,
-                min=min_value,
-                max=max_value,
-            )
-        return dict_customprop
-    
-    elif full_name in context.active_object.pose.bones[source_bone].keys():
-        return
-    
-    dict_customprop[full_name] = dict(
-        item=context.active_object.pose.bones[source_bone],
-        prop=full_name,
-        default=default,
-        min=min_value,
-        max=max_value,
-    )
+    for name in full_name if isinstance(full_name, tuple) else (full_name,):
+        if name in existing:
+            continue
+        dict_customprop[name] = dict(
+            item=pose_bone,
+            prop=name,
+            default=default,
+            min=min_value,
+            max=max_value,
+        )
     return dict_customprop
 
 
@@ -194,8 +202,8 @@ def is_suffix_in_custom_prop(prop_name: str, suffix_side: str | None) -> str:
         opposite_side = f"{prop_name}{opposite_side}"
         return original_side, opposite_side
 
-    elif suffix_side == ".top" or suffix_side == "bot":
-        opposite_side = ".bot" if suffix_side == ".top" else ".bot"
+    elif suffix_side == ".top" or suffix_side == ".bot":
+        opposite_side = ".bot" if suffix_side == ".top" else ".top"
         original_side = f"{prop_name}{suffix_side}"
         opposite_side = f"{prop_name}{opposite_side}"
         return original_side, opposite_side
@@ -299,8 +307,12 @@ class AC_OT_add_CustomProp(Operator):
         description='Bone name in which custom properties will be stored.',
         default='Properties',
     ) # type: ignore
-
-    
+    schema_path: StringProperty(
+        name='Schema',
+        description='JSON file with the custom properties, the bundled set if empty.',
+        default='',
+        subtype='FILE_PATH',
+    ) # type: ignore
 
     @classmethod
     def poll(cls, context: Context) -> bool:
@@ -309,13 +321,21 @@ class AC_OT_add_CustomProp(Operator):
         return False
 
     def execute(self, context):
-        source_bone_properties = "Properties"
+        source_bone_properties = self.source_bone_name
 
-        if not source_bone_properties in {bone.name for bone in context.active_object.data.bones}:
+        if not context.active_object.data.bones.get(source_bone_properties):
             self.report({"ERROR"}, f"There is no bone named '{source_bone_properties}'")
             return {"CANCELLED"}
-        
-        properties_to_ui(all_custom_properties(source_bone_properties), context)
 
-        self.report({"INFO"}, f"Custom Properties added in '{source_bone_properties}' bone")
+        try:
+            custom_properties = all_custom_properties(source_bone_properties, self.schema_path)
+        except ValueError as error:
+            self.report({"ERROR"}, str(error))
+            return {"CANCELLED"}
+
+        created = properties_to_ui(custom_properties, context)
+        # ID properties set from Python don't tag the armature, UI caches rely on it.
+        context.active_object.update_tag()
+
+        self.report({"INFO"}, f"{created} Custom Properties added in '{source_bone_properties}' bone")
         return {"FINISHED"}
@@ -0,0 +1,164 @@
+from bpy.types import Context, Object, Operator
+from bpy.props import BoolProperty
+import json
+import bpy
+from . import driver_expressions
+
+
+def deformed_objects(armature: Object) -> list:
+    """Objects parented to the armature or deformed by it with an Armature modifier."""
+
+    return [
+        obj for obj in bpy.data.objects
+        if obj.parent == armature
+        or any(mod.type == 'ARMATURE' and mod.object == armature for mod in obj.modifiers)
+    ]
+
+
+def driver_owners(armature: Object) -> list:
+    """Datablocks whose drivers belong to the rig: the armature object (pose bones and
+    constraints), its data (bones and bone collections), and the objects and shape keys
+    of the meshes it deforms."""
+
+    owners = [armature, armature.data]
+    for obj in deformed_objects(armature):
+        owners.append(obj)
+        shape_keys = getattr(obj.data, "shape_keys", None)
+        if shape_keys:
+            owners.append(shape_keys)
+    return owners
+
+
+def audit_drivers(owners: list) -> list:
+    """Checks every driver of owners, returns (fcurve, entry) pairs.
+
+    Entries hold the owner, data path, expression, whether it is a simple expression,
+    the reasons when it isn't, its estimated cost and the rewrite, if there is one.
+    Drivers that are already simple only get a 'minor' change, e.g. a single variable
+    expression that can be an Averaged Value driver, which isn't counted as a problem.
+    """
+
+    audit: list = []
+    for owner in owners:
+        animation_data = owner.animation_data
+        if not animation_data:
+            continue
+        for fcurve in animation_data.drivers:
+            driver = fcurve.driver
+            variables = tuple(variable.name for variable in driver.variables)
+            entry = dict(
+                owner=owner.name,
+                id_type=owner.bl_rna.identifier,
+                data_path=fcurve.data_path,
+                index=fcurve.array_index,
+                type=driver.type,
+                expression=driver.expression if driver.type == 'SCRIPTED' else None,
+                simple=True,
+                reasons=[],
+                cost=1.0,
+                rewrite=None,
+                minor=None,
+            )
+            if not driver.is_valid:
+                entry["reasons"].append("invalid driver")
+
+            if driver.type == 'SCRIPTED':
+                reasons = driver_expressions.simple_expression_problems(driver.expression, variables)
+                if driver.use_self:
+                    reasons.insert(0, "uses self")
+                entry["reasons"] += reasons
+                entry["simple"] = not reasons
+                entry["cost"] = driver_expressions.estimate_cost(driver.expression, variables, driver.use_self)
+
+                if not driver.use_self:
+                    if driver_expressions.single_variable(driver.expression, variables):
+                        # Already a simple expression, switching only skips the expression.
+                        entry["minor"] = {"type": 'AVERAGE'}
+                    elif reasons:
+                        expression = driver_expressions.rewrite_expression(driver.expression, variables)
+                        if expression:
+                            entry["rewrite"] = {"expression": expression}
+            audit.append((fcurve, entry))
+    return audit
+
+
+def apply_rewrites(audit: list) -> int:
+    """Applies the rewrites and minor changes of audit_drivers, returns how many drivers
+    were rewritten, minor changes not included.
+
+    Rewritten expressions are checked again against the driver variables, a rewrite
+    the simple evaluator wouldn't take is skipped.
+    """
+
+    count = 0
+    for fcurve, entry in audit:
+        driver = fcurve.driver
+        if entry["minor"]:
+            driver.type = entry["minor"]["type"]
+        rewrite = entry["rewrite"]
+        if not rewrite:
+            continue
+        variables = tuple(variable.name for variable in driver.variables)
+        if driver_expressions.simple_expression_problems(rewrite["expression"], variables):
+            continue
+        driver.expression = rewrite["expression"]
+        entry["cost"] = 1.0
+        entry["simple"] = True
+        count += 1
+    return count
+
+
+class AC_OT_AuditDrivers(Operator):
+    """Lists the drivers of the rig that Blender evaluates with Python and rewrites the common patterns"""
+
+    bl_idname = "rigtoolkit.audit_drivers"
+    bl_label = "Audit Drivers"
+    bl_options = {"REGISTER", "UNDO"}
+
+    rewrite: BoolProperty(
+        name="Rewrite",
+        description="Rewrite single variable, clamp, power, linear blend and math. drivers into simple expressions",
+        default=False,
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        if hasattr(context.active_object, "type"):
+            return context.active_object.type == "ARMATURE"
+        return False
+
+    def execute(self, context):
+        armature = context.active_object
+        audit = audit_drivers(driver_owners(armature))
+        cost = sum(entry["cost"] for _fcurve, entry in audit)
+        rewritten = apply_rewrites(audit) if self.rewrite else 0
+        entries = [entry for _fcurve, entry in audit]
+
+        python = [entry for entry in entries if not entry["simple"]]
+        available = sum(1 for entry in entries if entry["rewrite"])
+        report = dict(
+            armature=armature.name,
+            drivers=len(entries),
+            python=len(python),
+            cost=cost,
+            cost_after=sum(entry["cost"] for entry in entries),
+            rewritten=rewritten,
+            rewrites_available=0 if self.rewrite else available,
+            minor=sum(1 for entry in entries if entry["minor"]),
+            entries=python + [entry for entry in entries if entry["simple"] and (entry["rewrite"] or entry["reasons"])],
+        )
+
+        # Full report in a text datablock, readable in the Text Editor.
+        text_name = f"{armature.name}-driver_audit.json"
+        text = bpy.data.texts.get(text_name) or bpy.data.texts.new(text_name)
+        text.from_string(json.dumps(report, indent=2))
+
+        if rewritten:
+            self.report({"INFO"}, f"{rewritten} drivers rewritten, {len(python)} still use Python, see '{text_name}'")
+        else:
+            self.report(
+                {"INFO"},
+                f"{len(entries)} drivers, {len(python)} use Python (cost {cost:.0f}), "
+                f"{available} rewrites available, see '{text_name}'",
+            )
+        return {"FINISHED"}
@@ -1,36 +1,58 @@
 from bpy.types import Context, Operator
-from pathlib import Path
-import bpy
+from bpy.props import BoolProperty, EnumProperty, StringProperty
+from . import preset_catalogue
 
 class HumanArmaturePreset(Operator):
-    """Appends Human Preset"""
+    """Appends or links an armature preset"""
     bl_idname = "rigtoolkit.human_armature_preset"
-    bl_label = "Appends Human Armature Preset" 
-    bl_description = "Appends an human armature preset" 
-    bl_options = {"REGISTER", "UNDO"} 
-    
+    bl_label = "Import Armature Preset"
+    bl_description = "Appends an armature preset, or links it with a library override"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filename: StringProperty(
+        name="File",
+        description="Preset file in armature_presets",
+        default="human_preset.blend",
+    )  # type: ignore
+    name: StringProperty(
+        name="Name",
+        description="Armature object or collection to import",
+        default="human_preset",
+    )  # type: ignore
+    kind: EnumProperty(
+        name="Type",
+        items=(
+            ("OBJECT", "Armature", "Import an armature object"),
+            ("COLLECTION", "Collection", "Import a collection with everything in it"),
+        ),
+        default="OBJECT",
+    )  # type: ignore
+    link: BoolProperty(
+        name="Link",
+        description="Link the preset with a library override instead of appending a copy",
+        default=False,
+    )  # type: ignore
+
     @classmethod
     def poll(cls, context: Context) -> bool:
         return context.mode == "OBJECT"
-    
+
     def execute(self, context):
-        current_dir = Path(__file__).parent.parent
-        folder = Path('/armature_presets/human_preset.blend')
-        preset_folder = f'{current_dir}{folder}'
-        armature_name = 'human_preset'
+        catalogue = preset_catalogue.catalogue()
+        preset = catalogue.get(self.filename)
+        if preset is None:
+            self.report({"ERROR"}, f"There is no preset file named '{self.filename}'")
+            return {"CANCELLED"}
 
-        #Code by Zender on Blenderartist. Edited to work specifically on this.
-        with bpy.data.libraries.load(preset_folder, link=False) as (data_from, data_to):
-            if not armature_name in {name for name in data_from.objects}:
-                self.report({"ERROR"}, f"There is no armature named '{armature_name}'")
-                return {"CANCELLED"}
-            
-            data_to.objects = [name for name in data_from.objects if name in armature_name]
+        names = preset["armatures"] if self.kind == "OBJECT" else preset["collections"]
+        if self.name not in names:
+            self.report({"ERROR"}, f"There is no {'armature' if self.kind == 'OBJECT' else 'collection'} named '{self.name}'")
+            return {"CANCELLED"}
 
-        for obj in data_to.objects:
-            context.scene.collection.objects.link(obj)
-            
-        self.report({"INFO"}, f"Succesfully imported armature '{armature_name}'")
-        return {"FINISHED"} 
-    
+        imported = preset_catalogue.import_preset(context, self.filename, self.name, self.kind, self.link)
+        if imported is None:
+            self.report({"ERROR"}, f"Could not import '{self.name}' from '{self.filename}'")
+            return {"CANCELLED"}
 
+        self.report({"INFO"}, f"Succesfully {'linked' if self.link else 'imported'} '{imported.name}'")
+        return {"FINISHED"}
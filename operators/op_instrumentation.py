@@ -0,0 +1,64 @@
+from bpy.types import Context, Operator
+from bpy.props import StringProperty
+import bpy
+from . import instrumentation
+
+
+def operator_classes() -> list:
+    """Toolkit operators whose execute gets timed."""
+
+    from . import classes
+    from ..rig_modules import classes as rig_classes
+    return [cls for cls in (*classes, *rig_classes) if cls is not AC_OT_Instrumentation]
+
+
+class AC_OT_Instrumentation(Operator):
+    """Starts or stops timing the rig helpers and operators, results go to a JSON lines log"""
+
+    bl_idname = "rigtoolkit.toggle_instrumentation"
+    bl_label = "Toggle Instrumentation"
+    bl_options = {"REGISTER"}
+
+    log_path: StringProperty(
+        name="Log",
+        description="JSON lines log, in the temporary folder if empty",
+        default="",
+        subtype='FILE_PATH',
+    )  # type: ignore
+
+    def execute(self, context):
+        if instrumentation.is_enabled():
+            instrumentation.disable()
+            for name, count, seconds in instrumentation.summary():
+                print(f"{name:<40} {count:>8} {seconds * 1000.0:>10.2f} ms")
+            self.report({"INFO"}, f"Instrumentation off, log in '{instrumentation.current_log()}'")
+            return {"FINISHED"}
+
+        path = bpy.path.abspath(self.log_path) if self.log_path else None
+        instrumentation.enable(operator_classes(), path)
+        self.report({"INFO"}, f"Instrumentation on, logging to '{instrumentation.current_log()}'")
+        return {"FINISHED"}
+
+
+class AC_OT_RedrawProfiler(Operator):
+    """Starts or stops timing the poll and draw of the toolkit panels"""
+
+    bl_idname = "rigtoolkit.toggle_redraw_profiler"
+    bl_label = "Toggle Redraw Profiler"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        from ..user_interface import classes, redraw_profiler
+        from ..user_interface.ui_custom_properties import VIEW3D_PT_RedrawProfileUI, panel_classes
+
+        if redraw_profiler.is_enabled():
+            for panel, method, mean_ms, max_ms, count in redraw_profiler.worst():
+                print(f"{panel + '.' + method:<48} mean {mean_ms:>8.3f} ms  max {max_ms:>8.3f} ms  ({count})")
+            redraw_profiler.disable()
+            self.report({"INFO"}, "Redraw profiler off, slowest panels printed to the console")
+        else:
+            redraw_profiler.enable([cls for cls in classes if cls is not VIEW3D_PT_RedrawProfileUI] + panel_classes())
+            self.report({"INFO"}, "Redraw profiler on, see the Redraw Profile panel")
+        for area in context.screen.areas:
+            area.tag_redraw()
+        return {"FINISHED"}
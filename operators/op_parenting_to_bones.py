@@ -2,12 +2,18 @@ from bpy.types import Context, Operator, PoseBone
 import bpy
 from mathutils import Matrix
 import bmesh
+import numpy as np
 from bpy_extras.object_utils import AddObjectHelper
 from bpy_extras import object_utils
 
 from bpy.props import (
+    EnumProperty,
     FloatProperty,
 )
+from ..rig_modules.apply_plan import TAG
+
+# Tag module of the cubes made by the Shared Mesh mode.
+PROXY_MODULE = "proxy_cube"
 
 
 def add_box(width, height, depth):
@@ -43,6 +49,46 @@ def add_box(width, height, depth):
     return verts, faces
 
 
+def box_arrays(width, height, depth) -> tuple:
+    """Returns add_box vertices as a (8, 3) array and faces as a (6, 4) array."""
+
+    verts_loc, faces = add_box(width, height, depth)
+    return np.array(verts_loc, dtype=np.float32), np.array(faces, dtype=np.int32)
+
+
+def fill_mesh(mesh, verts: np.ndarray, faces: np.ndarray) -> None:
+    """Writes quads into an empty mesh with foreach_set.
+
+    :param verts: (N, 3) vertex positions
+    :param faces: (M, 4) vertex indices of each quad
+    """
+
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.astype(np.float32).ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+
+def new_mesh(name: str):
+    """Creates a mesh replacing any old mesh with the same name."""
+
+    if bpy.data.meshes.get(name):
+        bpy.data.meshes.remove(bpy.data.meshes[name])
+    return bpy.data.meshes.new(name)
+
+
+def bone_matrices(bones, attr: str) -> np.ndarray:
+    """Reads a 4x4 matrix attribute of all bones in one call, returns a (N, 4, 4) array."""
+
+    matrices = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get(attr, matrices)
+    # Matrices come column major.
+    return matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+
 class ParentingToBone(Operator, AddObjectHelper):
     """Parent objects to bones."""
     bl_idname = "rigtoolkit.parenting_to_bones"
@@ -68,6 +114,16 @@ class ParentingToBone(Operator, AddObjectHelper):
         min=0.01, max=100.0,
         default=0.2,
     )  # type: ignore
+    mode: EnumProperty(
+        name="Mode",
+        description="How cubes are created for deform bones",
+        items=(
+            ("OBJECTS", "Mesh per Bone", "One cube object with its own mesh per deform bone"),
+            ("SHARED", "Shared Mesh", "One cube object per deform bone, all of them link the same mesh"),
+            ("JOINED", "Joined Mesh", "One mesh with a vertex group per deform bone and an Armature modifier"),
+        ),
+        default="OBJECTS",
+    )  # type: ignore
 
     @staticmethod
     def active_armature(context: Context) -> list:
@@ -82,9 +138,120 @@ class ParentingToBone(Operator, AddObjectHelper):
             return context.active_object.type == "ARMATURE"
         return False
 
+    def deform_bones(self, arm) -> tuple:
+        """Returns deform bone names and the indices in arm.data.bones."""
+
+        use_deform = np.empty(len(arm.data.bones), dtype=bool)
+        arm.data.bones.foreach_get("use_deform", use_deform)
+        indices = np.flatnonzero(use_deform)
+        bone_names = arm.data.bones.keys()
+        names = [bone_names[i] for i in indices]
+        return names, indices
+
+    @staticmethod
+    def pose_indices(arm, names: list, indices: np.ndarray) -> np.ndarray:
+        """Indices in arm.pose.bones of the bones at indices in arm.data.bones.
+
+        Pose bones are normally in the same order as the bones, otherwise they are
+        looked up by name.
+        """
+
+        pose_names = arm.pose.bones.keys()
+        if pose_names == arm.data.bones.keys():
+            return indices
+        by_name = {name: i for i, name in enumerate(pose_names)}
+        return np.array([by_name[name] for name in names], dtype=np.int64)
+
+    def shared_mesh(self, context: Context, arm) -> set:
+        """Links the same cube mesh into one object per deform bone."""
+
+        names, indices = self.deform_bones(arm)
+        verts, faces = box_arrays(self.width, self.height, self.depth)
+        mesh = new_mesh(f"{arm.name}-proxy_cube")
+        fill_mesh(mesh, verts, faces)
+
+        # Pose matrices are in armature space.
+        world = np.array(arm.matrix_world, dtype=np.float32)
+        matrices = world @ bone_matrices(arm.pose.bones, "matrix")[self.pose_indices(arm, names, indices)]
+
+        # Only cubes made by an earlier run for this armature are reused, other objects
+        # named after a bone are left alone.
+        proxies = {}
+        for obj in bpy.data.objects:
+            tag = obj.get(TAG)
+            if obj.type == 'MESH' and tag and tag.get("module") == PROXY_MODULE and tag.get("armature") == arm.name:
+                proxies[tag.get("bone")] = obj
+
+        collection = context.collection
+        for name, matrix in zip(names, matrices):
+            obj = proxies.get(name)
+            if obj:
+                obj.data = mesh
+            else:
+                obj = bpy.data.objects.new(name, mesh)
+                obj[TAG] = {"module": PROXY_MODULE, "armature": arm.name, "bone": name}
+            if obj.name not in collection.objects:
+                collection.objects.link(obj)
+
+            obj.parent = arm
+            obj.parent_bone = name
+            obj.parent_type = 'BONE'
+            obj.matrix_world = Matrix(matrix.tolist())
+
+        self.report({"INFO"}, f"{len(names)} cubes sharing mesh '{mesh.name}'")
+        return {"FINISHED"}
+
+    def joined_mesh(self, context: Context, arm) -> set:
+        """Builds one mesh with a rigid vertex group per deform bone, deformed by the armature."""
+
+        names, indices = self.deform_bones(arm)
+        verts, faces = box_arrays(self.width, self.height, self.depth)
+        count = len(names)
+
+        # Rest matrices in armature space, cubes are placed in rest pose.
+        matrices = bone_matrices(arm.data.bones, "matrix_local")[indices]
+        homogeneous = np.hstack((verts, np.ones((len(verts), 1), dtype=np.float32)))
+        all_verts = np.einsum("nij,vj->nvi", matrices, homogeneous)[:, :, :3].reshape(-1, 3)
+        all_faces = (faces[None, :, :] + (np.arange(count, dtype=np.int32) * len(verts))[:, None, None]).reshape(-1, 4)
+
+        name = f"{arm.name}-proxy"
+        mesh = new_mesh(name)
+        fill_mesh(mesh, all_verts, all_faces)
+
+        obj = bpy.data.objects.get(name)
+        if obj and obj.type == 'MESH':
+            obj.data = mesh
+            obj.vertex_groups.clear()
+        else:
+            obj = bpy.data.objects.new(name, mesh)
+        if obj.name not in context.collection.objects:
+            context.collection.objects.link(obj)
+
+        for i, bone_name in enumerate(names):
+            start = i * len(verts)
+            obj.vertex_groups.new(name=bone_name).add(list(range(start, start + len(verts))), 1.0, 'REPLACE')
+
+        modifier = next((mod for mod in obj.modifiers if mod.type == 'ARMATURE'), None)
+        if not modifier:
+            modifier = obj.modifiers.new(name="Armature", type='ARMATURE')
+        modifier.object = arm
+
+        obj.parent = arm
+        obj.parent_type = 'OBJECT'
+        obj.matrix_parent_inverse = Matrix.Identity(4)
+        obj.matrix_basis = Matrix.Identity(4)
+
+        self.report({"INFO"}, f"{count} cubes joined in '{obj.name}'")
+        return {"FINISHED"}
+
     def execute(self, context):
         arm = self.active_armature(context)
 
+        if self.mode == "SHARED":
+            return self.shared_mesh(context, arm)
+        if self.mode == "JOINED":
+            return self.joined_mesh(context, arm)
+
         # Add Box code from example files.
         for bone in arm.pose.bones:
             # Only add cubes to deform bones.
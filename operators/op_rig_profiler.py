@@ -0,0 +1,150 @@
+from bpy.types import Context, Object, Operator
+from bpy.props import IntProperty, StringProperty
+from pathlib import Path
+import json
+import tempfile
+import time
+import bpy
+from ..rig_modules.apply_plan import TAG
+
+# Armature name -> last profile report, drawn by the Rig Profile panel.
+last_reports: dict = {}
+
+
+def constraint_groups(armature: Object) -> dict:
+    """Constraints of the pose grouped by generated module and by constraint type.
+
+    A module group has the constraints of the bones the module made and the constraints
+    of other bones that target them (the Stretch To of a chain to its handles).
+    """
+
+    modules: dict = {}
+    for bone in armature.data.bones:
+        tag = bone.get(TAG)
+        if tag is not None:
+            modules[bone.name] = tag.get("module")
+
+    groups: dict = {}
+    for pose_bone in armature.pose.bones:
+        for con in pose_bone.constraints:
+            groups.setdefault(f"type:{con.type}", []).append(con)
+            module = modules.get(pose_bone.name) or modules.get(getattr(con, "subtarget", ""))
+            if module:
+                groups.setdefault(f"module:{module}", []).append(con)
+    return groups
+
+
+def segment_groups(armature: Object) -> dict:
+    """Bones with more than one bbone segment grouped by segment count."""
+
+    groups: dict = {}
+    for bone in armature.data.bones:
+        if bone.bbone_segments > 1:
+            groups.setdefault(f"bbone_segments:{bone.bbone_segments}", []).append(bone)
+    return groups
+
+
+def time_frames(context: Context, armature: Object, frames: range) -> float:
+    """Mean seconds per frame to step the scene through frames.
+
+    The armature is tagged before every step, so the pose is evaluated even when
+    nothing in it is animated.
+    """
+
+    scene = context.scene
+    start = time.perf_counter()
+    for frame in frames:
+        armature.update_tag(refresh={'DATA'})
+        scene.frame_set(frame)
+    return (time.perf_counter() - start) / max(len(frames), 1)
+
+
+def profile_rig(context: Context, armature: Object, frame_count: int) -> dict:
+    """Cost per frame of every constraint group and bbone segment group.
+
+    Each constraint group is timed with its constraints disabled and each segment group
+    with its bones at one segment, the cost is the time saved against all enabled.
+    """
+
+    scene = context.scene
+    current = scene.frame_current
+    frames = range(scene.frame_start, scene.frame_start + frame_count)
+
+    # Warm up once, the first evaluation pays for caches.
+    time_frames(context, armature, frames[:1])
+    baseline = time_frames(context, armature, frames)
+    groups: list = []
+    try:
+        for name, constraints in constraint_groups(armature).items():
+            enabled = [con.enabled for con in constraints]
+            for con in constraints:
+                con.enabled = False
+            try:
+                muted = time_frames(context, armature, frames)
+            finally:
+                for con, state in zip(constraints, enabled):
+                    con.enabled = state
+            groups.append(dict(group=name, count=len(constraints), ms=(baseline - muted) * 1000.0))
+
+        for name, bones in segment_groups(armature).items():
+            segments = [bone.bbone_segments for bone in bones]
+            for bone in bones:
+                bone.bbone_segments = 1
+            try:
+                single = time_frames(context, armature, frames)
+            finally:
+                for bone, count in zip(bones, segments):
+                    bone.bbone_segments = count
+            groups.append(dict(group=name, count=len(bones), ms=(baseline - single) * 1000.0))
+    finally:
+        scene.frame_set(current)
+
+    groups.sort(key=lambda group: group["ms"], reverse=True)
+    return dict(
+        armature=armature.name,
+        bones=len(armature.data.bones),
+        frames=frame_count,
+        frame_ms=baseline * 1000.0,
+        groups=groups,
+    )
+
+
+class AC_OT_ProfileRig(Operator):
+    """Steps through frames and times the rig with groups of constraints disabled"""
+
+    bl_idname = "rigtoolkit.profile_rig"
+    bl_label = "Profile Rig"
+    bl_options = {"REGISTER"}
+
+    frames: IntProperty(
+        name="Frames",
+        description="Frames stepped through for every measure",
+        min=1, max=1000,
+        default=24,
+    )  # type: ignore
+    filepath: StringProperty(
+        name="Report",
+        description="JSON report, next to the blend file by default",
+        default="//rig_profile.json",
+        subtype='FILE_PATH',
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        if hasattr(context.active_object, "type"):
+            return context.active_object.type == "ARMATURE"
+        return False
+
+    def execute(self, context):
+        armature = context.active_object
+        report = profile_rig(context, armature, self.frames)
+        last_reports[armature.name] = report
+
+        if bpy.data.filepath or not self.filepath.startswith("//"):
+            path = Path(bpy.path.abspath(self.filepath))
+        else:
+            path = Path(tempfile.gettempdir()) / Path(self.filepath[2:]).name
+        path.write_text(json.dumps(report, indent=2))
+
+        self.report({"INFO"}, f"{report['frame_ms']:.2f} ms per frame, report in '{path}'")
+        return {"FINISHED"}
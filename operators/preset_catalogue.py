@@ -0,0 +1,81 @@
+"""Index of the armatures and collections in the preset .blend files.
+
+Each file is read once and read again only when its modification time changes. Files
+are opened in temporary blend data, so indexing doesn't add anything to the open file.
+"""
+
+from pathlib import Path
+import bpy
+
+PRESET_DIR = Path(__file__).parent.parent / 'armature_presets'
+# Libraries of the toolkit itself, not presets.
+EXCLUDED: set = {'widgets.blend'}
+
+# File name -> {"mtime", "armatures", "collections"}.
+_index: dict = {}
+
+
+def preset_files() -> list:
+    return sorted(path for path in PRESET_DIR.glob('*.blend') if path.name not in EXCLUDED)
+
+
+def scan(path: Path) -> dict:
+    """Armature objects and collections of a .blend file."""
+
+    with bpy.data.temp_data() as temp_data:
+        with temp_data.libraries.load(str(path), link=True) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+            collections = list(data_from.collections)
+        armatures = sorted(obj.name for obj in data_to.objects if obj and obj.type == 'ARMATURE')
+    return dict(mtime=path.stat().st_mtime, armatures=armatures, collections=sorted(collections))
+
+
+def entry(path: Path) -> dict:
+    """Index entry of path, scanned again if the file changed since the last scan."""
+
+    cached = _index.get(path.name)
+    if cached is None or cached["mtime"] != path.stat().st_mtime:
+        cached = _index[path.name] = scan(path)
+    return cached
+
+
+def catalogue() -> dict:
+    """File name -> index entry of every preset file, files that are gone are dropped."""
+
+    files = preset_files()
+    for name in set(_index) - {path.name for path in files}:
+        del _index[name]
+    return {path.name: entry(path) for path in files}
+
+
+def is_indexed(path: Path) -> bool:
+    cached = _index.get(path.name)
+    return cached is not None and cached["mtime"] == path.stat().st_mtime
+
+
+def import_preset(context, filename: str, name: str, kind: str = 'OBJECT', link: bool = False):
+    """Appends an armature object or a collection of a preset file, or links it with a
+    library override so the rig data stays shared with the library.
+
+    :param kind: 'OBJECT' or 'COLLECTION'.
+    :return: the new object or collection, None if the file doesn't have it.
+    """
+
+    path = PRESET_DIR / filename
+    attr = 'objects' if kind == 'OBJECT' else 'collections'
+    with bpy.data.libraries.load(str(path), link=link) as (data_from, data_to):
+        names = [item for item in getattr(data_from, attr) if item == name]
+        setattr(data_to, attr, names)
+
+    items = [item for item in getattr(data_to, attr) if item is not None]
+    if not items:
+        return None
+    item = items[0]
+
+    if link:
+        return item.override_hierarchy_create(context.scene, context.view_layer, do_fully_editable=True)
+    if kind == 'OBJECT':
+        context.scene.collection.objects.link(item)
+    else:
+        context.scene.collection.children.link(item)
+    return item
@@ -1,8 +1,11 @@
 from bpy.utils import register_class, unregister_class
+import bpy
 
 from . import single_bbone_chain
 from . import single_control
 from . import torso_chain
+from . import set_bone
+from . import widget_shapes
 
 classes: list = [
     single_bbone_chain.AC_OT_NewBBones,
@@ -11,12 +14,29 @@ classes: list = [
     torso_chain.AC_OT_TorsoChain,
 ]
 
+# Loading a file, undo and redo free the IDs the widget index points to. Widget
+# meshes are found by name, only a file load makes them stale.
+handlers: tuple = (
+    (bpy.app.handlers.load_post, set_bone.clear_widget_index),
+    (bpy.app.handlers.undo_post, set_bone.clear_widget_index),
+    (bpy.app.handlers.redo_post, set_bone.clear_widget_index),
+    (bpy.app.handlers.load_post, widget_shapes.clear_meshes),
+)
+
 
 def register_bone_presets() -> None:
     for cls in classes:
         register_class(cls)
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
 
 
 def unregister_bone_presets() -> None:
     for cls in classes:
         unregister_class(cls)
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
+    set_bone.clear_widget_index()
+    widget_shapes.clear_meshes()
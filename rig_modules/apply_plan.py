@@ -0,0 +1,185 @@
+"""Runs a rig_plan.RigPlan against the active armature."""
+
+from bpy.types import Context, EditBone
+import numpy as np
+from . import mode_passes
+from . import rig_plan
+from . import set_bone
+from . import set_bcontraints
+
+
+def read_chain(bones: list) -> list:
+    """Plain data copy of edit bones for the planners."""
+
+    return [
+        rig_plan.ChainBone(
+            name=bone.name,
+            head=tuple(bone.head),
+            tail=tuple(bone.tail),
+            roll=bone.roll,
+            bbone_x=bone.bbone_x,
+            parent=bone.parent.name if bone.parent else None,
+            use_connect=bone.use_connect,
+        )
+        for bone in bones
+    ]
+
+
+# Custom property that marks the bones a rig module made: {"module", "chain", "name"}.
+TAG = "rigtoolkit"
+
+
+def read_generated(edit_bones) -> dict:
+    """State of the tagged bones of the armature for rig_plan.diff_plan."""
+
+    existing: dict = {}
+    for bone in edit_bones:
+        tag = bone.get(TAG)
+        if tag is None:
+            continue
+        key = (tag.get("module"), tag.get("chain"), tag.get("name"))
+        existing[key] = dict(
+            name=bone.name,
+            head=tuple(bone.head),
+            tail=tuple(bone.tail),
+            roll=bone.roll,
+            bbone_size=bone.bbone_x,
+            inherit_scale=bone.inherit_scale,
+            parent=bone.parent.name if bone.parent else None,
+            collections={col.name for col in bone.collections},
+        )
+    return existing
+
+
+def apply_edit(plan: rig_plan.RigPlan, context: Context, existing: dict | None = None) -> dict:
+    """Edit Mode pass. Creates the missing bones of the plan in one batch and wires them.
+
+    Bones made by an earlier run of the module on the same chain are updated in place,
+    and the ones the plan doesn't want anymore are deleted, so a re-run doesn't add
+    copies. Blender can rename new bones if the name is taken, so it returns a
+    dictionary of planned name -> bone name that apply_pose uses.
+
+    :param existing: result of read_generated, read here if not given.
+    """
+
+    edit_bones = context.active_object.data.edit_bones
+    if existing is None:
+        existing = read_generated(edit_bones)
+    diff = rig_plan.diff_plan(plan, existing)
+
+    if diff.delete:
+        deleted = set(diff.delete)
+        for name in diff.delete:
+            edit_bones.remove(edit_bones[name])
+        for key in [key for key, state in existing.items() if state['name'] in deleted]:
+            del existing[key]
+
+    specs = diff.create
+    new_bones = set_bone.create_bulk(
+        context,
+        names=[spec.name for spec in specs],
+        heads=np.array([spec.head for spec in specs]).reshape(-1, 3),
+        tails=np.array([spec.tail for spec in specs]).reshape(-1, 3),
+        rolls=np.array([spec.roll for spec in specs]),
+        bbone_sizes=np.array([spec.bbone_size for spec in specs]),
+        inherit_scale=[spec.inherit_scale for spec in specs],
+    )
+    names = dict(diff.names)
+    for spec, bone in zip(specs, new_bones):
+        names[spec.name] = bone.name
+        bone[TAG] = {"module": plan.module, "chain": spec.chain, "name": spec.name}
+
+    for spec, name in diff.update:
+        bone = edit_bones[name]
+        bone.head = spec.head
+        bone.tail = spec.tail
+        bone.roll = spec.roll
+        bone.bbone_x = bone.bbone_z = spec.bbone_size
+        bone.inherit_scale = spec.inherit_scale
+
+    def get(name: str) -> EditBone:
+        return edit_bones[names.get(name, name)]
+
+    for child, parent in plan.parents:
+        bone, parentbone = get(child), get(parent)
+        if bone.parent != parentbone or bone.use_connect:
+            set_bone.parenting(bone=bone, parentbone=parentbone, context=context)
+
+    for bone_name, side, handle in plan.handles:
+        bone, handle_bone = get(bone_name), get(handle)
+        if side == 'start':
+            if bone.bbone_custom_handle_start != handle_bone:
+                bone.bbone_custom_handle_start = handle_bone
+        elif bone.bbone_custom_handle_end != handle_bone:
+            bone.bbone_custom_handle_end = handle_bone
+
+    for bone_name in plan.bbone_bones:
+        set_bone.bbones_prop(get(bone_name))
+    for bone_name, inherit in plan.inherit_scale.items():
+        set_bone.bone_prop(get(bone_name), inherit)
+
+    groups: dict = {}
+    for spec in plan.bones:
+        if spec.collection:
+            groups.setdefault(spec.collection, []).append(get(spec.name))
+    set_bone.assign_collections(groups, context)
+
+    return names
+
+
+def apply_pose(plan: rig_plan.RigPlan, context: Context, names: dict) -> None:
+    """Pose Mode pass. Widgets, pose properties and constraints of the plan."""
+
+    pose_bones = context.active_object.pose.bones
+
+    def get(name: str):
+        return pose_bones[names.get(name, name)]
+
+    shapes = set_bone.widgets(
+        tuple({spec.widget for spec in plan.bones if spec.widget}), context=context
+    )
+    for spec in plan.bones:
+        bone = get(spec.name)
+        if spec.widget:
+            set_bone.assign_widget(bone=bone, shape=shapes.get(spec.widget))
+        set_bone.pbone_properties(bone=bone)
+
+    set_bcontraints.apply_constraints(
+        [
+            set_bcontraints.constraint_spec(
+                get(spec['bone']),
+                spec['type'],
+                subtarget=names.get(spec['subtarget'], spec['subtarget']),
+                spaces=spec['space'],
+                influence=spec['influence'],
+                name=spec['name'],
+            )
+            for spec in plan.constraints
+        ],
+        target=context.active_object,
+    )
+
+
+def apply(plans: list, context: Context) -> list:
+    """Applies several plans with one Edit Mode pass and one Pose Mode pass.
+
+    Inside a mode_passes block the passes are queued with the work of other modules
+    and the returned list is filled when the block runs them.
+
+    :return: names dictionary of each plan, see apply_edit.
+    :rtype: list
+    """
+
+    all_names: list = []
+
+    def edit(context: Context) -> None:
+        existing = read_generated(context.active_object.data.edit_bones)
+        all_names.extend(apply_edit(plan, context, existing) for plan in plans)
+
+    def pose(context: Context) -> None:
+        for plan, names in zip(plans, all_names):
+            apply_pose(plan, context, names)
+
+    mode_passes.schedule(context, "EDIT", edit)
+    mode_passes.schedule(context, "POSE", pose)
+    return all_names
@@ -0,0 +1,103 @@
+"""Groups the work of several rig modules by mode so the armature switches mode once per pass.
+
+Every switch out of Edit Mode rebuilds the armature data from the edit bones and
+updates the depsgraph, so building a character module by module pays for it several
+times. Inside a `mode_passes` block the modules queue their work instead of running
+it, and the block runs all the Edit Mode work, then all the Pose Mode work:
+
+    with mode_passes(context):
+        bpy.ops.rigtoolkit.create_torso_chain()
+        bpy.ops.rigtoolkit.create_single_bbone()
+
+Work queued in the block only sees the bones as they were when it started, call
+ModePasses.run inside the block when a module needs the bones of an earlier one.
+"""
+
+from contextlib import contextmanager
+from bpy.types import Context
+from bpy import ops
+
+# Passes run in this order. Context.mode -> mode_set mode.
+ORDER: tuple = ("OBJECT", "EDIT", "POSE")
+CONTEXT_MODES: dict = {"OBJECT": "OBJECT", "EDIT_ARMATURE": "EDIT", "POSE": "POSE"}
+
+_active = None
+
+
+class ModePasses:
+    """Queue of functions per mode. Each function is called with the context of the pass."""
+
+    def __init__(self) -> None:
+        self.work: dict = {mode: [] for mode in ORDER}
+        # Mode the armature is left in after the passes, None to stay in the last one.
+        self.final_mode = None
+        self.switches = 0
+
+    def __str__(self) -> str:
+        return ", ".join(f"{mode}: {len(funcs)}" for mode, funcs in self.work.items())
+
+    def add(self, mode: str, func) -> None:
+        self.work[mode].append(func)
+
+    def run(self, context: Context) -> None:
+        """Runs the queued work, switching mode only for the modes that have some."""
+
+        for mode in ORDER:
+            funcs, self.work[mode] = self.work[mode], []
+            if not funcs:
+                continue
+            if CONTEXT_MODES.get(context.mode) != mode:
+                ops.object.mode_set(mode=mode)
+                self.switches += 1
+            for func in funcs:
+                func(context)
+        if self.final_mode and CONTEXT_MODES.get(context.mode) != self.final_mode:
+            ops.object.mode_set(mode=self.final_mode)
+            self.switches += 1
+
+
+def active() -> ModePasses | None:
+    """Passes of the running mode_passes block, None outside of one."""
+
+    return _active
+
+
+@contextmanager
+def mode_passes(context: Context):
+    """Collects the work of the modules run in the block and runs it when the block ends.
+
+    Nested blocks join the outer one. Nothing runs if the block raises.
+    """
+
+    global _active
+    if _active is not None:
+        yield _active
+        return
+
+    _active = passes = ModePasses()
+    try:
+        yield passes
+        passes.run(context)
+    finally:
+        _active = None
+
+
+def schedule(context: Context, mode: str, func) -> None:
+    """Queues func in the running block, or runs it now outside of one."""
+
+    passes = _active or ModePasses()
+    passes.add(mode, func)
+    if passes is not _active:
+        passes.run(context)
+
+
+def end_in(context: Context, mode: str) -> None:
+    """Leaves the armature in mode, at the end of the running block or now outside of one.
+
+    In a block that already has work in mode this adds no switch.
+    """
+
+    passes = _active or ModePasses()
+    passes.final_mode = mode
+    if passes is not _active:
+        passes.run(context)
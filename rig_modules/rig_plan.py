@@ -0,0 +1,428 @@
+"""Plans the bones, parents, handles, constraints and widgets of the rig modules.
+
+This module doesn't import bpy. Chains are described with plain data (ChainBone) and
+planners return a RigPlan that apply_plan.py runs against Blender.
+"""
+
+import math
+
+
+def _add(a: tuple, b: tuple) -> tuple:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def _sub(a: tuple, b: tuple) -> tuple:
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _scale(a: tuple, factor: float) -> tuple:
+    return (a[0] * factor, a[1] * factor, a[2] * factor)
+
+
+def _normalized(a: tuple) -> tuple:
+    norm = math.sqrt(a[0] * a[0] + a[1] * a[1] + a[2] * a[2])
+    if norm == 0.0:
+        # Same fallback as a zero length bone, point it up.
+        return (0.0, 0.0, 1.0)
+    return _scale(a, 1.0 / norm)
+
+
+def naming(name: str, bone_type: str, sep: str = '-') -> str:
+    '''Puts preffix to bone name. It replaces its previous one if it has.'''
+
+    bname = name.split(sep)
+    if len(bname) < 2:
+        return f'{bone_type}-{name}'
+    bname[0] = bone_type
+    return sep.join(bname)
+
+
+class ChainBone:
+    """Plain data of an input bone."""
+
+    def __init__(
+        self,
+        name: str,
+        head: tuple,
+        tail: tuple,
+        roll: float = 0.0,
+        bbone_x: float = 0.1,
+        parent: str | None = None,
+        use_connect: bool = False,
+    ) -> None:
+        self.name = name
+        self.head = tuple(head)
+        self.tail = tuple(tail)
+        self.roll = roll
+        self.bbone_x = bbone_x
+        self.parent = parent
+        self.use_connect = use_connect
+
+    def __str__(self) -> str:
+        return f"Bone: {self.name}, Parent: {self.parent}, Head: {self.head}, Tail: {self.tail}"
+
+    @property
+    def vector(self) -> tuple:
+        return _sub(self.tail, self.head)
+
+    @property
+    def length(self) -> float:
+        return math.sqrt(sum(axis * axis for axis in self.vector))
+
+
+def chain_from_dicts(bones: list) -> list:
+    """Returns ChainBone instances from a list of dictionaries with the same keys."""
+
+    return [ChainBone(**bone) for bone in bones]
+
+
+def resolve_chains(parents: dict) -> tuple:
+    """Splits a selection into ordered chains in linear time.
+
+    A chain starts at a bone whose parent is not in the selection and follows the only
+    selected child. When a bone has more than one selected child the chain ends there
+    and every child starts a new chain (a branch).
+
+    :param parents: selected bone name -> parent name, or None if it has no parent.
+    :type parents: dict
+    :return: list of chains (lists of names, root first) and the names that could not
+        be ordered, e.g. bones in a parent cycle.
+    :rtype: tuple
+    """
+    children: dict = {name: [] for name in parents}
+    starts: list = []
+    for name, parent in parents.items():
+        if parent in children:
+            children[parent].append(name)
+        else:
+            starts.append(name)
+
+    chains: list = []
+    index = 0
+    while index < len(starts):
+        chain = [starts[index]]
+        index += 1
+        while len(children[chain[-1]]) == 1:
+            chain.append(children[chain[-1]][0])
+        # Branches start new chains.
+        starts.extend(children[chain[-1]])
+        chains.append(chain)
+
+    ordered = {name for chain in chains for name in chain}
+    unresolved = [name for name in parents if name not in ordered]
+    return chains, unresolved
+
+
+class BoneSpec:
+    """A bone the plan creates."""
+
+    def __init__(
+        self,
+        name: str,
+        head: tuple,
+        tail: tuple,
+        roll: float,
+        bbone_size: float,
+        source: str,
+        collection: str | None = None,
+        widget: str | None = None,
+        inherit_scale: str = 'AVERAGE',
+        chain: str | None = None,
+    ) -> None:
+        self.name = name
+        self.head = head
+        self.tail = tail
+        self.roll = roll
+        self.bbone_size = bbone_size
+        self.source = source
+        self.collection = collection
+        self.widget = widget
+        self.inherit_scale = inherit_scale
+        self.chain = chain or source
+
+    def __str__(self) -> str:
+        return f"Bone: {self.name}, Source: {self.source}, Collection: {self.collection}, Widget: {self.widget}"
+
+
+class RigPlan:
+    """Everything a rig module does to an armature, as plain data.
+
+    -- Attributes --
+    :bones = BoneSpec of the bones to create, in creation order.
+    :parents = (child, parent) names. Parents are set without connecting.
+    :handles = (bone, 'start' | 'end', handle) custom bbone handles.
+    :bbone_bones = input bones that get bbone settings.
+    :inherit_scale = input bone -> inherit scale type.
+    :constraints = dictionaries with bone, type, subtarget, space, influence and name.
+    :chain = name of the input bone that identifies the generated bones on a re-run.
+        Without it each bone is identified by its own source bone.
+    """
+
+    def __init__(self, module: str, chain: str | None = None) -> None:
+        self.module = module
+        self.chain = chain
+        self.bones: list = []
+        self.parents: list = []
+        self.handles: list = []
+        self.bbone_bones: list = []
+        self.inherit_scale: dict = {}
+        self.constraints: list = []
+
+    def __str__(self) -> str:
+        return f"Module: {self.module}, Bones: {len(self.bones)}, Constraints: {len(self.constraints)}"
+
+    def new_bone(
+        self,
+        bone: ChainBone,
+        bone_type: str,
+        bone_head: tuple,
+        bbone_size: float,
+        length: float,
+        bone_name: str = '',
+        inherir_scale: str = 'AVERAGE',
+        align_world: bool = False,
+        collection: str | None = None,
+        widget: str | None = None,
+    ) -> BoneSpec:
+        """Same placement as set_bone.create, the tail points along the input bone."""
+
+        if not align_world:
+            bone_tail = _add(bone.vector, bone.tail)
+        else:
+            bone_tail = _add(bone.head, (0.0, 0.0, 1.0))
+        bone_head = tuple(bone_head)
+        direction = _normalized(_sub(bone_tail, bone_head))
+
+        spec = BoneSpec(
+            name=bone_name if bone_name else naming(bone.name, bone_type),
+            head=bone_head,
+            tail=_add(bone_head, _scale(direction, length)),
+            roll=bone.roll,
+            bbone_size=bbone_size,
+            source=bone.name,
+            collection=collection,
+            widget=widget,
+            inherit_scale=inherir_scale,
+            chain=self.chain,
+        )
+        self.bones.append(spec)
+        return spec
+
+    def parent(self, child: str, parent: str) -> None:
+        self.parents.append((child, parent))
+
+    def handle(self, bone: str, side: str, handle: str) -> None:
+        self.handles.append((bone, side, handle))
+
+    def constraint(
+        self,
+        bone: str,
+        constraint_type: str,
+        subtarget: str,
+        space: str = "WORLD",
+        influence: float = 1.0,
+        name: str | None = None,
+    ) -> None:
+        self.constraints.append(
+            dict(bone=bone, type=constraint_type, subtarget=subtarget, space=space, influence=influence, name=name)
+        )
+
+    @property
+    def created(self) -> list:
+        return [spec.name for spec in self.bones]
+
+
+def bone_key(module: str, spec: BoneSpec) -> tuple:
+    """Identity of a generated bone across re-runs: (module, chain, planned name)."""
+
+    return (module, spec.chain, spec.name)
+
+
+def _close(a: tuple, b: tuple, tolerance: float) -> bool:
+    return all(abs(x - y) <= tolerance for x, y in zip(a, b))
+
+
+class RigDiff:
+    """What a plan changes in an armature that already has some of its bones.
+
+    -- Attributes --
+    :create = BoneSpec of the bones that don't exist yet.
+    :update = (BoneSpec, bone name) of existing bones that differ from the plan.
+    :unchanged = (BoneSpec, bone name) of existing bones that match the plan.
+    :delete = names of bones a previous run of the module made for the same chain
+        that the plan doesn't want anymore.
+    :names = planned name -> name of the existing bone.
+    """
+
+    def __init__(self) -> None:
+        self.create: list = []
+        self.update: list = []
+        self.unchanged: list = []
+        self.delete: list = []
+        self.names: dict = {}
+
+    def __str__(self) -> str:
+        return (
+            f"Create: {len(self.create)}, Update: {len(self.update)}, "
+            f"Unchanged: {len(self.unchanged)}, Delete: {len(self.delete)}"
+        )
+
+
+def diff_plan(plan: RigPlan, existing: dict, tolerance: float = 1e-5) -> RigDiff:
+    """Compares the bones of a plan against the bones made by earlier runs.
+
+    :param existing: bone_key -> dictionary with name, head, tail, roll, bbone_size,
+        inherit_scale, parent (name or None) and collections (names) of the bone.
+    :type existing: dict
+    """
+
+    diff = RigDiff()
+    parents = dict(plan.parents)
+    planned: list = []
+
+    for spec in plan.bones:
+        key = bone_key(plan.module, spec)
+        state = existing.get(key)
+        if state is None:
+            diff.create.append(spec)
+        else:
+            diff.names[spec.name] = state['name']
+            planned.append((spec, state))
+
+    for spec, state in planned:
+        parent = parents.get(spec.name)
+        same = (
+            _close(spec.head, state['head'], tolerance)
+            and _close(spec.tail, state['tail'], tolerance)
+            and abs(spec.roll - state['roll']) <= tolerance
+            and abs(spec.bbone_size - state['bbone_size']) <= tolerance
+            and spec.inherit_scale == state['inherit_scale']
+            and diff.names.get(parent, parent) == state['parent']
+            and (not spec.collection or spec.collection in state['collections'])
+        )
+        (diff.unchanged if same else diff.update).append((spec, state['name']))
+
+    keys = {bone_key(plan.module, spec) for spec in plan.bones}
+    chains = {spec.chain for spec in plan.bones}
+    for key, state in existing.items():
+        module, chain, _name = key
+        if module == plan.module and chain in chains and key not in keys:
+            diff.delete.append(state['name'])
+    return diff
+
+
+def plan_single_bbone(chain: list) -> RigPlan:
+    """BBone handles and a FK chain for a sorted chain of connected bones."""
+
+    plan = RigPlan('single_bbone', chain=chain[0].name)
+    fk_parents: list = []
+    end_handles: list = []
+    str_handle = None
+
+    for index, bone in enumerate(chain):
+        if index:
+            end_handle = plan.new_bone(bone, 'endHandle', bone.tail, 0.28, 0.25, collection='BB Handles', widget='WGT-fullsphere')
+            fk_bone = plan.new_bone(bone, 'FK', bone.head, 0.38, 0.15, collection='FK', widget='WGT-FK')
+
+            plan.parent(fk_bone.name, fk_parents[-1].name)
+            plan.parent(end_handles[-1].name, fk_bone.name)
+            plan.handle(bone.name, 'start', end_handles[-1].name)
+        else:
+            str_handle = plan.new_bone(bone, 'strHandle', bone.head, 0.28, 0.25, collection='BB Handles', widget='WGT-fullsphere')
+            end_handle = plan.new_bone(bone, 'endHandle', bone.tail, 0.28, 0.25, collection='BB Handles', widget='WGT-fullsphere')
+            fk_bone = plan.new_bone(bone, 'FK', bone.head, 0.38, 0.15, bone_name='CTRL-Bot', collection='FK', widget='WGT-CTRL')
+
+            plan.parent(str_handle.name, fk_bone.name)
+            plan.handle(bone.name, 'start', str_handle.name)
+
+        plan.handle(bone.name, 'end', end_handle.name)
+        fk_parents.append(fk_bone)
+        end_handles.append(end_handle)
+        plan.bbone_bones.append(bone.name)
+        plan.inherit_scale[bone.name] = 'ALIGNED'
+
+        # Constraints.
+        if not index:
+            plan.constraint(bone.name, 'COPY_LOCATION', str_handle.name)
+        plan.constraint(bone.name, 'STRETCH_TO', end_handle.name)
+
+    # Top Control of the FK Chain, the last handle follows it.
+    top_bone = plan.new_bone(chain[-1], 'CTRL', chain[-1].tail, 0.38, 0.15, bone_name='CTRL-Top', collection='FK', widget='WGT-CTRL')
+    plan.parent(top_bone.name, fk_parents[-1].name)
+    plan.parent(end_handles[-1].name, top_bone.name)
+    return plan
+
+
+def plan_torso_chain(
+    chain: list,
+    fkhinge: bool = False,
+    tweakcol: str = 'Tweak Torso',
+    ctrlcol: str = 'Control Torso',
+    fkcol: str = 'FK Torso',
+    mchcol: str = 'Mechanism Chain',
+) -> RigPlan:
+    """Tweak, FK and mechanism bones for a sorted torso chain of 2 or more bones."""
+
+    plan = RigPlan('torso_chain', chain=chain[0].name)
+    parenting_chain: list = []
+    last = len(chain) - 1
+
+    for index, bone in enumerate(chain):
+        twk_bone = plan.new_bone(bone, 'TWK', bone.head, bone.bbone_x*1.5, bone.length*0.3, collection=tweakcol, widget='WGT-sphere')
+        # To be only apply on the first bone in the chain.
+        if not index:
+            ctrl_cog = plan.new_bone(bone, 'CTRL', bone.tail, bone.bbone_x*1.9, bone.length*0.12, bone_name='COG', align_world=True, collection=ctrlcol, widget='WGT-CTRL')
+            ctrl_bone = plan.new_bone(bone, 'CTRL', bone.tail, bone.bbone_x*1.8, bone.length*0.14, bone_name='Hips', collection=ctrlcol, widget='WGT-saddle')
+
+            plan.parent(twk_bone.name, ctrl_bone.name)
+            plan.parent(ctrl_bone.name, ctrl_cog.name)
+            parenting_chain.append(ctrl_cog)
+            plan.constraint(bone.name, 'COPY_LOCATION', twk_bone.name)
+
+        # To be only apply on the chain.
+        else:
+            #Demeter cloudrig idea to deal with torso stretchy hierarchy.
+            org_bone = plan.new_bone(bone, 'ORG', bone.head, bone.bbone_x*1.2, bone.length*0.5, collection=mchcol)
+            fk_bone = plan.new_bone(bone, 'FK', bone.head, bone.bbone_x*1.7, bone.length*0.2, collection=fkcol, widget='WGT-FK')
+
+            # To be only apply on the penultimate bone in the chain.
+            if fkhinge and index == last - 1:
+                hinge_bone = plan.new_bone(bone, 'MCH', bone.head, bone.bbone_x*0.2, bone.length*0.2, collection=mchcol)
+                plan.parent(hinge_bone.name, parenting_chain[-1].name)
+                parenting_chain.append(hinge_bone)
+                plan.constraint(hinge_bone.name, 'COPY_ROTATION', 'COG')
+
+            plan.handle(chain[index - 1].name, 'end', twk_bone.name)
+            plan.parent(twk_bone.name, parenting_chain[-1].name)
+            plan.parent(fk_bone.name, parenting_chain[-1].name)
+            parenting_chain.append(fk_bone)
+            plan.constraint(org_bone.name, 'COPY_TRANSFORMS', fk_bone.name)
+            plan.constraint(chain[index - 1].name, 'STRETCH_TO', twk_bone.name)
+
+            # To be only apply on the last bone in the chain.
+            if index == last:
+                top_bone = plan.new_bone(bone, 'TWK', bone.tail, bone.bbone_x*1.5, bone.length*0.3, bone_name='TWK-top', collection=tweakcol, widget='WGT-sphere')
+                plan.handle(bone.name, 'end', top_bone.name)
+                plan.parent(top_bone.name, org_bone.name)
+                plan.constraint(bone.name, 'STRETCH_TO', top_bone.name)
+
+        plan.handle(bone.name, 'start', twk_bone.name)
+        plan.bbone_bones.append(bone.name)
+        plan.inherit_scale[bone.name] = 'ALIGNED'
+
+    return plan
+
+
+def plan_single_control(bones: list, copy_transforms: bool = False) -> RigPlan:
+    """A CTRL bone per input bone. The input bone is parented to it, or follows it
+    with a Copy Transforms constraint when copy_transforms is True."""
+
+    plan = RigPlan('single_control_constraint' if copy_transforms else 'single_control')
+    for bone in bones:
+        ctrl_bone = plan.new_bone(bone, 'CTRL', bone.head, 0.18, 0.15, collection='CTRL', widget='WGT-CTRL')
+        if copy_transforms:
+            plan.constraint(bone.name, 'COPY_TRANSFORMS', ctrl_bone.name)
+        else:
+            plan.inherit_scale[bone.name] = 'ALIGNED'
+            plan.parent(bone.name, ctrl_bone.name)
+    return plan
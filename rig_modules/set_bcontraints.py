@@ -1,41 +1,123 @@
-from bpy.types import Context, PoseBone
+from bpy.types import Context, Object, PoseBone
+
+# Name Blender gives to a new constraint of each type. Specs without a name use it.
+DEFAULT_NAMES: dict = {
+    "COPY_LOCATION": "Copy Location",
+    "COPY_ROTATION": "Copy Rotation",
+    "COPY_SCALE": "Copy Scale",
+    "COPY_TRANSFORMS": "Copy Transforms",
+    "STRETCH_TO": "Stretch To",
+    "DAMPED_TRACK": "Damped Track",
+    "IK": "IK",
+}
+
+
+def constraint_spec(
+    bone: PoseBone | str,
+    constraint_type: str,
+    subtarget: str,
+    spaces: str | tuple = "WORLD",
+    influence: float = 1.0,
+    name: str | None = None,
+) -> dict:
+    """Returns a constraint spec for apply_constraints.
+
+    :param spaces: space used as target and owner space, or a (target, owner) pair.
+    :param name: constraint name, defaults to Blender's name for the type.
+    """
+    if isinstance(spaces, str):
+        spaces = (spaces, spaces)
+    return dict(
+        bone=bone,
+        type=constraint_type,
+        subtarget=subtarget,
+        spaces=tuple(spaces),
+        influence=influence,
+        name=name or DEFAULT_NAMES.get(constraint_type, constraint_type.replace("_", " ").title()),
+    )
+
+
+def _matches(bconstraint, target: Object, spec: dict) -> bool:
+    return (
+        bconstraint.target == target
+        and bconstraint.subtarget == spec["subtarget"]
+        and bconstraint.target_space == spec["spaces"][0]
+        and bconstraint.owner_space == spec["spaces"][1]
+        and abs(bconstraint.influence - spec["influence"]) < 1e-6
+    )
+
+
+def apply_constraints(specs: list, target: Object) -> dict:
+    """Creates the constraints of a list of specs in one pass. Re-running it doesn't stack duplicates.
+
+    A constraint with the spec name and type on the bone is updated if it differs
+    and skipped if it already matches. A constraint with the spec name but another
+    type is replaced.
+
+    :param specs: dictionaries from constraint_spec, or tuples with its arguments
+        (bone, type, subtarget, spaces, influence, name). Bones can be pose bones
+        or names of pose bones of target.
+    :type specs: list
+    :param target: armature object used as constraint target.
+    :type target: Object
+    :return: count of 'created', 'updated' and 'skipped' constraints.
+    :rtype: dict
+    """
+    counts = {"created": 0, "updated": 0, "skipped": 0}
+    # Pose bone name -> {constraint name: constraint}, built once per bone.
+    indices: dict = {}
+
+    for spec in specs:
+        if not isinstance(spec, dict):
+            spec = constraint_spec(*spec)
+        bone = spec["bone"]
+        if isinstance(bone, str):
+            bone = target.pose.bones[bone]
+
+        index = indices.get(bone.name)
+        if index is None:
+            index = indices[bone.name] = {con.name: con for con in bone.constraints}
+
+        bconstraint = index.get(spec["name"])
+        if bconstraint and bconstraint.type != spec["type"]:
+            bone.constraints.remove(bconstraint)
+            bconstraint = None
+
+        if bconstraint is None:
+            bconstraint = bone.constraints.new(type=spec["type"])
+            bconstraint.name = spec["name"]
+            index[bconstraint.name] = bconstraint
+            counts["created"] += 1
+        elif _matches(bconstraint, target, spec):
+            counts["skipped"] += 1
+            continue
+        else:
+            counts["updated"] += 1
+
+        bconstraint.target = target
+        bconstraint.subtarget = spec["subtarget"]
+        bconstraint.target_space = spec["spaces"][0]
+        bconstraint.owner_space = spec["spaces"][1]
+        bconstraint.influence = spec["influence"]
+
+    return counts
 
 
 def copyloc_bconstraint(bone, subtarget: PoseBone, space: str, context: Context):
-    bconstraint = bone.constraints.new(type="COPY_LOCATION")
-    bconstraint.target = context.active_object
-    bconstraint.subtarget = subtarget
-    bconstraint.target_space = space
-    bconstraint.owner_space = space
-    bconstraint.influence = 1.0
+    apply_constraints([constraint_spec(bone, "COPY_LOCATION", subtarget, space)], context.active_object)
     return {"FINISHED"}
 
 def copyrot_bconstraint(bone, subtarget: PoseBone, space: str, context: Context):
-    bconstraint = bone.constraints.new(type="COPY_ROTATION")
-    bconstraint.target = context.active_object
-    bconstraint.subtarget = subtarget
-    bconstraint.target_space = space
-    bconstraint.owner_space = space
-    bconstraint.influence = 1.0
+    apply_constraints([constraint_spec(bone, "COPY_ROTATION", subtarget, space)], context.active_object)
     return {"FINISHED"}
 
 # def loc first bone in chain.
 def stretchto_bconstraint(bone, subtarget: PoseBone, space: str, context: Context):
     """Adds a Stretch To constraint."""
-    bconstraint = bone.constraints.new("STRETCH_TO")
-    bconstraint.target = context.active_object
-    bconstraint.subtarget = subtarget
-    bconstraint.target_space = space
-    bconstraint.owner_space = space
-    bconstraint.influence = 1.0
+    apply_constraints([constraint_spec(bone, "STRETCH_TO", subtarget, space)], context.active_object)
     return {"FINISHED"}
 
 
 def copytransform_bconstraint(bone, subtarget: PoseBone, space: str, context: Context):
-    bconstraint = bone.constraints.new("COPY_TRANSFORMS")
-    bconstraint.target = context.active_object
-    bconstraint.subtarget = subtarget
-    bconstraint.target_space = space
-    bconstraint.owner_space = space
-    bconstraint.influence = 1.0
+    apply_constraints([constraint_spec(bone, "COPY_TRANSFORMS", subtarget, space)], context.active_object)
     return {"FINISHED"}
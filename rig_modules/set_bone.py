@@ -1,8 +1,21 @@
 from bpy.types import Context, EditBone, PoseBone, BoneCollection
 from pathlib import Path
 import bpy
+from bpy.app.handlers import persistent
+from . import rig_plan
+from . import widget_shapes
 import math
 import mathutils
+import numpy as np
+
+WIDGET_LIBRARY = Path(__file__).parent.parent / 'armature_presets' / 'widgets.blend'
+# Smallest share of the armature create_bulk writes with foreach_set instead of per bone.
+BULK_FRACTION = 0.25
+
+# Session index of widget name -> widget object.
+_widget_index: dict = {}
+# (modification time, object names) of WIDGET_LIBRARY when it was last read.
+_library_names: tuple = (None, frozenset())
 
 def assign_widget(bone: PoseBone, shape) -> any:         
 
@@ -17,13 +30,40 @@ def assign_widget(bone: PoseBone, shape) -> any:
 
 def collection(bone: EditBone, colname: str, context: Context) -> any:
 
-    arm = context.active_object.data
-    if colname not in arm.collections: 
-        arm.collections.new(name=colname)
-    arm.collections[colname].assign(bone)
+    assign_collections({colname: [bone]}, context)
     return {'FINISHED'}
 
 
+def assign_collections(groups: dict, context: Context) -> dict:
+    """Assigns bones to bone collections, one group per collection.
+
+    Missing collections are created once. A bone listed twice in a group is assigned
+    once, and assign skips bones already in the collection.
+
+    :param groups: collection name -> edit bones.
+    :type groups: dict
+    :return: collection name -> number of bones assigned.
+    :rtype: dict
+    """
+
+    arm = context.active_object.data
+    # Nested collections are only in collections_all.
+    collections = {col.name: col for col in arm.collections_all}
+    assigned: dict = {}
+    for colname, bones in groups.items():
+        bone_collection = collections.get(colname)
+        if bone_collection is None:
+            bone_collection = collections[colname] = arm.collections.new(name=colname)
+        seen: set = set()
+        count = 0
+        for bone in bones:
+            if bone.name not in seen:
+                seen.add(bone.name)
+                count += bool(bone_collection.assign(bone))
+        assigned[colname] = count
+    return assigned
+
+
 def bbones_prop(bone: EditBone, handle_type: str = "TANGENT") -> any:
 
     if bone.bbone_segments == 1:
@@ -91,6 +131,134 @@ align_world = False,
     return new_bone
 
 
+def create_bulk(
+context: Context,
+names: list,
+heads: np.ndarray,
+tails: np.ndarray,
+rolls: np.ndarray,
+bbone_sizes: np.ndarray,
+inherit_scale: list | str = 'AVERAGE',
+) -> list:
+    """Creates N edit bones and writes their attributes.
+
+    heads and tails are (N, 3) arrays, rolls and bbone_sizes (N,) arrays. foreach_set
+    can only write the whole collection, so it is used when the new bones are at least
+    BULK_FRACTION of the armature. Fewer new bones are written one by one, so adding a
+    few bones to a big rig doesn't read and write every bone. Enum properties can't go
+    through foreach_set, inherit_scale is set per bone.
+    """
+
+    edit_bones = context.object.data.edit_bones
+    count = len(edit_bones)
+    new_bones = [edit_bones.new(name) for name in names]
+    if not new_bones:
+        return new_bones
+    total = count + len(new_bones)
+
+    heads = np.asarray(heads, dtype=np.float32).reshape(-1, 3)
+    tails = np.asarray(tails, dtype=np.float32).reshape(-1, 3)
+    rolls = np.asarray(rolls, dtype=np.float32)
+    bbone_sizes = np.asarray(bbone_sizes, dtype=np.float32)
+
+    if len(new_bones) < total * BULK_FRACTION:
+        for new_bone, head, tail, roll, size in zip(new_bones, heads, tails, rolls, bbone_sizes):
+            new_bone.head = head
+            new_bone.tail = tail
+            new_bone.roll = float(roll)
+            new_bone.bbone_x = float(size)
+            new_bone.bbone_z = float(size)
+            new_bone.use_deform = False
+    else:
+        # Edit bones are appended at the end, only that slice of the arrays changes.
+        def write(attr: str, values: np.ndarray, dtype, size: int = 1) -> None:
+            array = np.empty(total * size, dtype=dtype)
+            edit_bones.foreach_get(attr, array)
+            array[count * size:] = np.asarray(values, dtype=dtype).ravel()
+            edit_bones.foreach_set(attr, array)
+
+        write('head', heads, np.float32, 3)
+        write('tail', tails, np.float32, 3)
+        write('roll', rolls, np.float32)
+        write('bbone_x', bbone_sizes, np.float32)
+        write('bbone_z', bbone_sizes, np.float32)
+        write('use_deform', np.zeros(len(new_bones), dtype=bool), bool)
+
+    if isinstance(inherit_scale, str):
+        inherit_scale = [inherit_scale] * len(new_bones)
+    for new_bone, inherit in zip(new_bones, inherit_scale):
+        new_bone.inherit_scale = inherit
+
+    return new_bones
+
+
+class BoneBatch:
+    """Collects new bones with the same arguments as create() and builds them in one go.
+
+    add() returns the index of the bone in the list returned by build().
+    """
+
+    def __init__(self) -> None:
+        self.names: list = []
+        self.heads: list = []
+        self.directions: list = []
+        self.lengths: list = []
+        self.rolls: list = []
+        self.bbone_sizes: list = []
+        self.inherit_scale: list = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(
+    self,
+    bone: EditBone,
+    bone_type: str,
+    bone_head: tuple,
+    bbone_size: float,
+    length: float,
+    bone_name: str = '',
+    inherir_scale: str = 'AVERAGE',
+    align_world = False,
+    ) -> int:
+
+        if not align_world:
+            bone_tail = (bone.vector) + bone.tail
+        else:
+            bone_tail = bone.head + mathutils.Vector((0,0,1))
+
+        self.names.append(bone_name if bone_name else naming(bone, bone_type))
+        self.heads.append(tuple(bone_head))
+        self.directions.append(tuple(mathutils.Vector(bone_tail) - mathutils.Vector(bone_head)))
+        self.lengths.append(length)
+        self.rolls.append(bone.roll)
+        self.bbone_sizes.append(bbone_size)
+        self.inherit_scale.append(inherir_scale)
+        return len(self.names) - 1
+
+    def build(self, context: Context) -> list:
+        """Creates all queued bones, tails are placed along their direction at the given length."""
+
+        heads = np.array(self.heads, dtype=np.float64).reshape(-1, 3)
+        directions = np.array(self.directions, dtype=np.float64).reshape(-1, 3)
+        norms = np.linalg.norm(directions, axis=1)
+        # Same fallback as a zero length bone, point it up.
+        directions[norms == 0.0] = (0.0, 0.0, 1.0)
+        norms[norms == 0.0] = 1.0
+        lengths = np.array(self.lengths, dtype=np.float64)
+        tails = heads + directions / norms[:, None] * lengths[:, None]
+
+        return create_bulk(
+            context,
+            names=self.names,
+            heads=heads,
+            tails=tails,
+            rolls=np.array(self.rolls),
+            bbone_sizes=np.array(self.bbone_sizes),
+            inherit_scale=self.inherit_scale,
+        )
+
+
 def naming(bone: EditBone, bone_type: str, sep: str = '-') -> str:
     '''Puts preffix to bone name. It replaces its previous one if it has.'''
 
@@ -118,39 +286,131 @@ def pbone_properties(bone: PoseBone) -> any:
     return {"FINISHED"}
 
 
+def chains(bones: list) -> tuple:
+    """Splits selected edit bones into ordered chains, see rig_plan.resolve_chains.
+
+    :return: list of chains of edit bones, and the edit bones that could not be ordered.
+    :rtype: tuple
+    """
+
+    by_name = {bone.name: bone for bone in bones}
+    parents = {bone.name: bone.parent.name if bone.parent else None for bone in bones}
+    name_chains, unresolved = rig_plan.resolve_chains(parents)
+    return (
+        [[by_name[name] for name in chain] for chain in name_chains],
+        [by_name[name] for name in unresolved],
+    )
+
+
 def sorting(bone_chain: list) -> list:
-    '''Sorting the parent of the chain first and then all the recursive children. Not depending on order of creation.'''
+    '''Returns the first chain of the selection that starts on an unparented bone. Use chains() to get all of them.'''
 
-    bchain = [bone for bone in bone_chain if bone.parent == None]
-    if not bchain:
-        return False
-    for childbone in bchain[0].children_recursive:
-        bchain.append(childbone)
-    return bchain
+    for bchain in chains(bone_chain)[0]:
+        if bchain[0].parent == None:
+            return bchain
+    return False
 
 
 def widget(widget_name: str, context: Context) -> EditBone:
+    """Returns a single widget object, see widgets()."""
+
+    return widgets((widget_name,), context).get(widget_name)
+
 
-    current_dir = Path(__file__).parent.parent
-    folder = Path('/armature_presets/widgets.blend')
-    preset_folder = f'{current_dir}{folder}'
+def cached_widget(widget_name: str) -> bpy.types.Object | None:
+    """Returns the indexed widget object if it is still valid in the current file."""
 
-    for obj in bpy.data.objects.values():
+    obj = _widget_index.get(widget_name)
+    if obj is None:
+        return None
+    try:
         if obj.name == widget_name:
             return obj
-        
-    with bpy.data.libraries.load(preset_folder, link=False) as (data_from, data_to):
-        data_to.objects = [name for name in data_from.objects if not name in bpy.data.objects.keys() and name in widget_name]
+    except ReferenceError:
+        # Object was removed with bpy.data.objects.remove since it was indexed.
+        pass
+    del _widget_index[widget_name]
+    return None
 
-    widgetcoll = context.active_object.name.replace('RIG', 'WIDGET')
-    if widgetcoll in bpy.data.collections.keys():
-        for obj in data_to.objects:
-            context.scene.collection.objects.link(obj)
-            bpy.data.collections[widgetcoll].objects.link(obj)
-            context.scene.collection.objects.unlink(obj)  
-            return obj
-    else:
-        for obj in data_to.objects:
+
+def library_widget_names() -> frozenset:
+    """Object names in widgets.blend, read once per file version."""
+
+    global _library_names
+    mtime = WIDGET_LIBRARY.stat().st_mtime
+    if _library_names[0] != mtime:
+        with bpy.data.libraries.load(str(WIDGET_LIBRARY), link=False) as (data_from, data_to):
+            names = frozenset(data_from.objects)
+        _library_names = (mtime, names)
+    return _library_names[1]
+
+
+def index_widgets() -> int:
+    """Adds the widgets already in the file to the index, returns how many it found."""
+
+    for obj in bpy.data.objects:
+        if obj.name.startswith('WGT-'):
+            _widget_index[obj.name] = obj
+    return len(_widget_index)
+
+
+def widgets(widget_names: tuple | list, context: Context) -> dict:
+    """Returns a dictionary of widget name -> widget object.
+
+    Widgets already in the file are found through the session index. Missing widgets
+    are generated by widget_shapes when it knows the shape, the rest are appended
+    from widgets.blend in a single library load.
+    """
+
+    found: dict = {}
+    missing: list = []
+    for name in widget_names:
+        obj = cached_widget(name) or bpy.data.objects.get(name)
+        if obj is None:
+            missing.append(name)
+            continue
+        _widget_index[name] = obj
+        found[name] = obj
+
+    if not missing:
+        return found
+
+    widgetcoll = bpy.data.collections.get(context.active_object.name.replace('RIG', 'WIDGET'))
+
+    def add(obj: bpy.types.Object) -> None:
+        if widgetcoll:
+            widgetcoll.objects.link(obj)
+        else:
             context.scene.collection.objects.link(obj)
-            return obj
-        
+        _widget_index[obj.name] = obj
+        found[obj.name] = obj
+
+    generated = [widget_shapes.generate(name) for name in missing]
+    for obj in generated:
+        if obj is not None:
+            add(obj)
+    missing = [name for name, obj in zip(missing, generated) if obj is None]
+
+    # Skips opening the library when it doesn't have any of the missing widgets.
+    if not missing:
+        return found
+    library_names = library_widget_names()
+    missing = [name for name in missing if name in library_names]
+    if not missing:
+        return found
+
+    with bpy.data.libraries.load(str(WIDGET_LIBRARY), link=False) as (data_from, data_to):
+        data_to.objects = [name for name in data_from.objects if name in missing]
+
+    for obj in data_to.objects:
+        if obj is not None:
+            add(obj)
+    return found
+
+
+@persistent
+def clear_widget_index(*args) -> None:
+    """Drops the widget index when another file is loaded or on undo and redo, the
+    indexed objects are freed then and can't be read anymore."""
+
+    _widget_index.clear()
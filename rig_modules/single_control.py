@@ -1,7 +1,7 @@
 from bpy.types import Context, Operator
 from bpy import ops
-from . import set_bone
-from . import set_bcontraints
+from . import rig_plan
+from . import apply_plan
 
 class AC_OT_SingleControl(Operator):
     """Adding CTRL Bones to selected bones."""
@@ -24,29 +24,8 @@ class AC_OT_SingleControl(Operator):
             self.report({"ERROR"}, f"No Bones selected")
             return {"CANCELLED"}
         #----------------------Operation----------------
-        for bone in context.selected_editable_bones:
-            ctrl_bone = set_bone.create(
-                    bone,
-                    bone_type='CTRL',
-                    bone_head=bone.head,
-                    bbone_size=0.18,
-                    length=0.15,
-                    context=context,
-                )
-            set_bone.bone_prop(bone)
-            set_bone.parenting(bone, ctrl_bone, context)
-            set_bone.collection(bone=ctrl_bone, colname='CTRL',context=context)    
-
-        if not context.mode == "POSE":
-            ops.object.mode_set(mode="POSE")
-                    
-
-        CTRLwidget = set_bone.widget(widget_name='WGT-CTRL', context=context)
-        
-        for bone in context.active_object.pose.bones.values():
-            if bone.name.startswith('CTRL'):
-                set_bone.assign_widget(bone=bone, shape=CTRLwidget)
-            set_bone.pbone_properties(bone=bone)
+        plan = rig_plan.plan_single_control(apply_plan.read_chain(context.selected_editable_bones))
+        apply_plan.apply([plan], context)
         
         self.report({"INFO"}, f"Control added")
         return {"FINISHED"}
@@ -79,38 +58,11 @@ class AC_OT_SingleControlConstraint(Operator):
                 return {"CANCELLED"}
 
         #----------------------Operation----------------
-        for bone in context.selected_editable_bones:
-            ctrl_bone = set_bone.create(
-                    bone,
-                    bone_type='CTRL',
-                    bone_head=bone.head,
-                    bbone_size=0.18,
-                    length=0.15,
-                    context=context,
-                )
-            
-            set_bone.collection(bone=ctrl_bone, colname='CTRL',context=context)    
-
-        if not context.mode == "POSE":
-            ops.object.mode_set(mode="POSE")
-                    
-        CTRLwidget = set_bone.widget(widget_name='WGT-CTRL', context=context)
-        
-        for bone in context.active_object.pose.bones.values():
-            if bone.name.startswith('CTRL'):
-                set_bone.assign_widget(bone=bone, shape=CTRLwidget)
-            set_bone.pbone_properties(bone=bone)
-
-        #Add Constraints
-        for bone in context.selected_pose_bones:
-            ctrlbone = f'CTRL-{bone.name}' if 'DEF' not in bone.name else bone.name.replace('DEF', 'CTRL')
+        plan = rig_plan.plan_single_control(
+            apply_plan.read_chain(context.selected_editable_bones), copy_transforms=True
+        )
+        apply_plan.apply([plan], context)
 
-            set_bcontraints.copytransform_bconstraint(
-                bone,
-                subtarget=ctrlbone,
-                space="WORLD",
-                context=context,
-            )
         self.report({"INFO"}, f"Control Copy Transform added")
         return {"FINISHED"}
 
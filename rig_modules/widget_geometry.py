@@ -0,0 +1,113 @@
+"""Vertices and edges of the toolkit widgets, built with NumPy. No bpy here.
+
+Shapes follow the objects in armature_presets/widgets.blend: they lie in the XY plane
+of the object, Z = 0, and their sizes are the sizes of the library shapes. set_bone.
+assign_widget rotates every custom shape 90 degrees around X and scales it, so the
+generated widgets face down the bone exactly like the library ones.
+"""
+
+import numpy as np
+
+# Widget name -> (shape function, parameters). Sizes measured from widgets.blend.
+SHAPES: dict = {}
+
+
+def ring(resolution: int = 32, radius: float = 1.0, axis: int = 2, offset: float = 0.0, width: float = 1.0) -> tuple:
+    """Closed circle around axis (0 X, 1 Y, 2 Z) at offset along it.
+
+    :param width: scale of the first axis of the circle's plane, X for rings around Z.
+    :return: (resolution, 3) vertices and (resolution, 2) edges.
+    """
+
+    angles = np.linspace(0.0, 2.0 * np.pi, resolution, endpoint=False)
+    plane = [index for index in range(3) if index != axis]
+    verts = np.zeros((resolution, 3), dtype=np.float32)
+    verts[:, plane[0]] = np.cos(angles) * radius * width
+    verts[:, plane[1]] = np.sin(angles) * radius
+    verts[:, axis] = offset
+    index = np.arange(resolution, dtype=np.int32)
+    edges = np.stack((index, np.roll(index, -1)), axis=1)
+    return verts, edges
+
+
+def combine(*parts: tuple) -> tuple:
+    """Joins (vertices, edges) parts into one, shifting the edge indices of each part."""
+
+    verts: list = []
+    edges: list = []
+    count = 0
+    for part_verts, part_edges in parts:
+        verts.append(part_verts)
+        edges.append(part_edges + count)
+        count += len(part_verts)
+    return np.concatenate(verts), np.concatenate(edges)
+
+
+def square(size: float = 1.0, subdivisions: int = 2) -> tuple:
+    """Square outline from -size to size, each side split in subdivisions edges."""
+
+    steps = np.linspace(-size, size, subdivisions + 1, dtype=np.float32)[:-1]
+    sides = (
+        np.stack((steps, np.full_like(steps, -size)), axis=1),
+        np.stack((np.full_like(steps, size), steps), axis=1),
+        np.stack((-steps, np.full_like(steps, size)), axis=1),
+        np.stack((np.full_like(steps, -size), -steps), axis=1),
+    )
+    outline = np.concatenate(sides)
+    verts = np.zeros((len(outline), 3), dtype=np.float32)
+    verts[:, :2] = outline
+    index = np.arange(len(verts), dtype=np.int32)
+    return verts, np.stack((index, np.roll(index, -1)), axis=1)
+
+
+def circle(resolution: int = 32, size: float = 1.0, width: float = 1.0) -> tuple:
+    """Ring in the XY plane, width stretches it along X into an oval."""
+
+    return ring(resolution, size, axis=2, width=width)
+
+
+def sphere(resolution: int = 32, size: float = 1.0) -> tuple:
+    """Three rings, one around each axis."""
+
+    return combine(*(ring(resolution, size, axis=axis) for axis in range(3)))
+
+
+def full_sphere(resolution: int = 24, size: float = 1.0, rings: int = 5, meridians: int = 4) -> tuple:
+    """Latitude rings around Z and meridians through both poles."""
+
+    latitudes = np.linspace(-np.pi / 2, np.pi / 2, rings + 2)[1:-1]
+    parts = [ring(resolution, size * np.cos(lat), axis=2, offset=size * np.sin(lat)) for lat in latitudes]
+    for index in range(meridians):
+        verts, edges = ring(resolution, size, axis=1)
+        angle = np.pi * index / meridians
+        rotation = np.array(
+            [[np.cos(angle), -np.sin(angle), 0.0], [np.sin(angle), np.cos(angle), 0.0], [0.0, 0.0, 1.0]],
+            dtype=np.float32,
+        )
+        parts.append((verts @ rotation.T, edges))
+    return combine(*parts)
+
+
+def saddle(resolution: int = 32, size: float = 1.0, height: float = 0.4) -> tuple:
+    """Ring in the XY plane that goes up and down twice along Z, like a saddle."""
+
+    verts, edges = ring(resolution, size, axis=2)
+    angles = np.linspace(0.0, 2.0 * np.pi, resolution, endpoint=False)
+    verts[:, 2] = np.cos(2.0 * angles) * height * size
+    return verts, edges
+
+
+SHAPES.update({
+    'WGT-CTRL': (square, dict(size=0.446, subdivisions=2)),
+    'WGT-FK': (circle, dict(resolution=32, size=0.346, width=1.303)),
+    'WGT-sphere': (sphere, dict(resolution=32, size=0.368)),
+    'WGT-fullsphere': (full_sphere, dict(resolution=24, size=0.2)),
+    'WGT-saddle': (saddle, dict(resolution=32, size=0.414, height=0.4)),
+})
+
+
+def build(name: str) -> tuple:
+    """(vertices, edges) of a known shape."""
+
+    function, parameters = SHAPES[name]
+    return function(**parameters)
@@ -0,0 +1,57 @@
+"""Builds the toolkit widgets as wire meshes, so custom shapes don't need widgets.blend.
+
+The shapes come from widget_geometry, in the same plane and size as the library
+widgets. Each shape is stored as one mesh shared by every widget object of the open file.
+"""
+
+import numpy as np
+import bpy
+from bpy.app.handlers import persistent
+from .widget_geometry import SHAPES, build
+
+# Widget name -> name of the mesh made for it in the open file. Names, not meshes, are
+# kept, undo and redo free the meshes and a stale reference can't be read safely.
+_meshes: dict = {}
+
+
+def build_mesh(name: str, verts: np.ndarray, edges: np.ndarray) -> bpy.types.Mesh:
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set('co', np.ascontiguousarray(verts, dtype=np.float32).ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set('vertices', np.ascontiguousarray(edges, dtype=np.int32).ravel())
+    mesh.update()
+    return mesh
+
+
+def shape_mesh(name: str) -> bpy.types.Mesh | None:
+    """Mesh of a widget in the open file, built the first time. None if name isn't a
+    known shape."""
+
+    mesh_name = _meshes.get(name)
+    mesh = bpy.data.meshes.get(mesh_name) if mesh_name else None
+    if mesh is not None:
+        return mesh
+
+    if name not in SHAPES:
+        return None
+    mesh = build_mesh(name, *build(name))
+    _meshes[name] = mesh.name
+    return mesh
+
+
+@persistent
+def clear_meshes(*args) -> None:
+    """Forgets the meshes when another file is loaded, a mesh with the same name there
+    isn't one of ours."""
+
+    _meshes.clear()
+
+
+def generate(name: str) -> bpy.types.Object | None:
+    """New widget object for a known shape, using the shared mesh of the shape."""
+
+    mesh = shape_mesh(name)
+    if mesh is None:
+        return None
+    return bpy.data.objects.new(name, mesh)
@@ -0,0 +1,15 @@
+"""Pytest plugin, loaded by pytest.ini, that lets the tests run without Blender.
+
+The repository root is the add-on package and its __init__.py imports bpy. pytest
+imports the __init__.py of every package above a test module, so the root is
+collected as a plain directory instead.
+"""
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collect_directory(path, parent):
+    if path == parent.config.rootpath:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
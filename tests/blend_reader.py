@@ -0,0 +1,126 @@
+"""Reads mesh vertices out of an uncompressed .blend file without Blender.
+
+Only what the widget tests need: the file blocks, the SDNA struct layouts, and the
+vertex positions of the mesh of each object, from the 'position' attribute that
+Blender 3.5+ stores in the mesh vertex data.
+"""
+
+import re
+import struct
+
+
+class BlendFile:
+
+    def __init__(self, path) -> None:
+        self.data = open(path, "rb").read()
+        if self.data[:7] != b"BLENDER":
+            raise ValueError(f"{path} is not an uncompressed .blend file")
+        self.pointer_size = 8 if self.data[7:8] == b"-" else 4
+        self.endian = "<" if self.data[8:9] == b"v" else ">"
+        self.pointer_format = self.endian + ("Q" if self.pointer_size == 8 else "I")
+
+        # Block header: code, size, old pointer, SDNA index, count.
+        self.blocks: list = []
+        offset = 12
+        while offset < len(self.data):
+            code = self.data[offset:offset + 4].rstrip(b"\0").decode("latin1")
+            size = struct.unpack_from(self.endian + "i", self.data, offset + 4)[0]
+            pointer = struct.unpack_from(self.pointer_format, self.data, offset + 8)[0]
+            body = offset + 16 + self.pointer_size
+            self.blocks.append(dict(code=code, size=size, pointer=pointer, offset=body))
+            if code == "ENDB":
+                break
+            offset = body + size
+        self.by_pointer = {block["pointer"]: block for block in self.blocks}
+        self._read_sdna(next(block for block in self.blocks if block["code"] == "DNA1")["offset"])
+
+    def _read_sdna(self, start: int) -> None:
+        data, endian = self.data, self.endian
+        offset = start + 4
+
+        def strings(offset: int) -> tuple:
+            count = struct.unpack_from(endian + "i", data, offset + 4)[0]
+            offset += 8
+            items = []
+            for _ in range(count):
+                end = data.index(b"\0", offset)
+                items.append(data[offset:end].decode("latin1"))
+                offset = end + 1
+            return items, start + ((offset - start + 3) & ~3)
+
+        names, offset = strings(offset)
+        types, offset = strings(offset)
+        lengths = struct.unpack_from(endian + f"{len(types)}h", data, offset + 4)
+        offset = start + ((offset + 4 + 2 * len(types) - start + 3) & ~3)
+
+        # Struct name -> field name -> (offset, type, size, is pointer).
+        self.structs: dict = {}
+        count = struct.unpack_from(endian + "i", data, offset + 4)[0]
+        offset += 8
+        for _ in range(count):
+            struct_type, field_count = struct.unpack_from(endian + "hh", data, offset)
+            offset += 4
+            fields = {}
+            field_offset = 0
+            for _ in range(field_count):
+                field_type, field_name = struct.unpack_from(endian + "hh", data, offset)
+                offset += 4
+                name = names[field_name]
+                is_pointer = name.startswith("*") or name.startswith("(*")
+                size = self.pointer_size if is_pointer else lengths[field_type]
+                for dimension in re.findall(r"\[(\d+)\]", name):
+                    size *= int(dimension)
+                base = re.sub(r"\[.*", "", name).strip("*()")
+                fields[base] = (field_offset, types[field_type], size, is_pointer)
+                field_offset += size
+            self.structs[types[struct_type]] = dict(fields=fields, size=lengths[struct_type])
+
+    def read(self, struct_name: str, base: int, path: str):
+        """Value of a dotted field path of a struct at base: pointer, int, float or string."""
+
+        for part in path.split("."):
+            field_offset, field_type, size, is_pointer = self.structs[struct_name]["fields"][part]
+            base += field_offset
+            struct_name = field_type
+        if is_pointer:
+            return struct.unpack_from(self.pointer_format, self.data, base)[0]
+        if field_type == "char":
+            return self.data[base:base + size].split(b"\0")[0].decode("latin1")
+        return struct.unpack_from(self.endian + {"int": "i", "float": "f", "short": "h"}[field_type], self.data, base)[0]
+
+    def _layers(self, base: int, custom_data: str) -> dict:
+        layers = {}
+        pointer = self.read("Mesh", base, f"{custom_data}.layers")
+        if not pointer:
+            return layers
+        layer_size = self.structs["CustomDataLayer"]["size"]
+        start = self.by_pointer[pointer]["offset"]
+        for index in range(self.read("Mesh", base, f"{custom_data}.totlayer")):
+            layer = start + index * layer_size
+            layers[self.read("CustomDataLayer", layer, "name")] = self.read("CustomDataLayer", layer, "data")
+        return layers
+
+    def object_vertices(self) -> dict:
+        """Object name -> list of (x, y, z) of its mesh, objects without a mesh are skipped."""
+
+        meshes = {}
+        for block in self.blocks:
+            if block["code"] != "ME":
+                continue
+            base = block["offset"]
+            count = self.read("Mesh", base, "totvert")
+            positions = self._layers(base, "vdata").get("position")
+            if not positions:
+                continue
+            start = self.by_pointer[positions]["offset"]
+            meshes[block["pointer"]] = [
+                struct.unpack_from(self.endian + "3f", self.data, start + 12 * index) for index in range(count)
+            ]
+
+        objects = {}
+        for block in self.blocks:
+            if block["code"] == "OB":
+                mesh = meshes.get(self.read("Object", block["offset"], "data"))
+                if mesh is not None:
+                    objects[self.read("Object", block["offset"], "id.name")[2:]] = mesh
+        return objects
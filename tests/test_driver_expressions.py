@@ -0,0 +1,64 @@
+"""Tests of the driver expression checks, they run without Blender."""
+
+from pathlib import Path
+import importlib.util
+import unittest
+
+_spec = importlib.util.spec_from_file_location(
+    "driver_expressions", Path(__file__).resolve().parent.parent / "operators" / "driver_expressions.py"
+)
+driver_expressions = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(driver_expressions)
+
+
+class TestSimpleExpression(unittest.TestCase):
+
+    def test_simple(self):
+        for expression in (
+            "a",
+            "a * 2 + b",
+            "clamp(a)",
+            "clamp(a, 0, 1)",
+            "lerp(a, b, 0.5) if frame > 10 else -a",
+            "max(a, b, 0)",
+            "log(a, 2)",
+            "sin(pi * a) and not b",
+        ):
+            self.assertEqual(driver_expressions.simple_expression_problems(expression, ("a", "b")), [], expression)
+
+    def test_python_only(self):
+        for expression in (
+            "c",
+            "a ** 2",
+            "math.sin(a)",
+            "bpy.data.objects['x'].location.x",
+            "sign(a)",
+            "'text'",
+            "clamp(x=a)",
+        ):
+            self.assertNotEqual(driver_expressions.simple_expression_problems(expression, ("a", "b")), [], expression)
+
+    def test_argument_counts(self):
+        for expression in ("sin(a, b, a)", "round(a, 2)", "lerp(a, b)", "clamp(a, 0)", "max()", "atan2(a)"):
+            problems = driver_expressions.simple_expression_problems(expression, ("a", "b"))
+            self.assertEqual(len(problems), 1, expression)
+            self.assertIn("arguments", problems[0])
+
+
+class TestRewrite(unittest.TestCase):
+
+    def test_rewrites(self):
+        variables = ("a", "b")
+        self.assertEqual(driver_expressions.rewrite_expression("math.sin(a)", variables), "sin(a)")
+        self.assertEqual(driver_expressions.rewrite_expression("a ** 2", variables), "pow(a, 2)")
+        self.assertEqual(driver_expressions.rewrite_expression("np.clip(a, 0, 1)", variables), "clamp(a, 0, 1)")
+        self.assertEqual(driver_expressions.rewrite_expression("float(a)", variables), "a")
+
+    def test_rewrite_output_is_checked(self):
+        variables = ("a", "b")
+        for expression in ("math.sin(a, b)", "np.clip(a, 0)", "round(a, 2)", "np.sign(a)", "a"):
+            self.assertIsNone(driver_expressions.rewrite_expression(expression, variables), expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""Tests of the rig planning layer, they run without Blender.
+
+rig_modules/__init__.py imports bpy, so rig_plan.py is loaded from its path.
+"""
+
+from pathlib import Path
+import importlib.util
+import unittest
+
+_spec = importlib.util.spec_from_file_location(
+    "rig_plan", Path(__file__).resolve().parent.parent / "rig_modules" / "rig_plan.py"
+)
+rig_plan = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(rig_plan)
+
+
+def spine(count: int) -> list:
+    """Connected chain of count bones going up Z, one unit long each."""
+
+    return rig_plan.chain_from_dicts([
+        dict(
+            name=f"DEF-spine.{index + 1:03}",
+            head=(0.0, 0.0, float(index)),
+            tail=(0.0, 0.0, float(index + 1)),
+            parent=f"DEF-spine.{index:03}" if index else None,
+            use_connect=bool(index),
+        )
+        for index in range(count)
+    ])
+
+
+def existing_state(plan) -> dict:
+    """The bones of plan as read_generated would return them after applying it."""
+
+    parents = dict(plan.parents)
+    return {
+        rig_plan.bone_key(plan.module, spec): dict(
+            name=spec.name,
+            head=spec.head,
+            tail=spec.tail,
+            roll=spec.roll,
+            bbone_size=spec.bbone_size,
+            inherit_scale=spec.inherit_scale,
+            parent=parents.get(spec.name),
+            collections=[spec.collection] if spec.collection else [],
+        )
+        for spec in plan.bones
+    }
+
+
+class TestResolveChains(unittest.TestCase):
+
+    def test_single_chain(self):
+        chains, unresolved = rig_plan.resolve_chains({"c": "b", "a": None, "b": "a"})
+        self.assertEqual(chains, [["a", "b", "c"]])
+        self.assertEqual(unresolved, [])
+
+    def test_branches_start_new_chains(self):
+        parents = {"a": None, "b": "a", "x": "b", "c": "b", "d": "b", "e": "d"}
+        chains, unresolved = rig_plan.resolve_chains(parents)
+        self.assertEqual(chains, [["a", "b"], ["x"], ["c"], ["d", "e"]])
+        self.assertEqual(unresolved, [])
+
+    def test_parent_outside_selection_starts_a_chain(self):
+        chains, _unresolved = rig_plan.resolve_chains({"b": "a", "c": "b"})
+        self.assertEqual(chains, [["b", "c"]])
+
+    def test_cycle_is_unresolved(self):
+        chains, unresolved = rig_plan.resolve_chains({"a": "b", "b": "a", "c": None})
+        self.assertEqual(chains, [["c"]])
+        self.assertEqual(unresolved, ["a", "b"])
+
+
+class TestPlanners(unittest.TestCase):
+
+    def test_naming(self):
+        self.assertEqual(rig_plan.naming("DEF-spine", "FK"), "FK-spine")
+        self.assertEqual(rig_plan.naming("spine", "FK"), "FK-spine")
+
+    def test_single_bbone(self):
+        plan = rig_plan.plan_single_bbone(spine(2))
+        self.assertEqual(plan.created, [
+            "strHandle-spine.001", "endHandle-spine.001", "CTRL-Bot",
+            "endHandle-spine.002", "FK-spine.002", "CTRL-Top",
+        ])
+        self.assertIn(("FK-spine.002", "CTRL-Bot"), plan.parents)
+        self.assertIn(("endHandle-spine.002", "CTRL-Top"), plan.parents)
+        self.assertEqual(plan.handles, [
+            ("DEF-spine.001", "start", "strHandle-spine.001"),
+            ("DEF-spine.001", "end", "endHandle-spine.001"),
+            ("DEF-spine.002", "start", "endHandle-spine.001"),
+            ("DEF-spine.002", "end", "endHandle-spine.002"),
+        ])
+        self.assertEqual(
+            [(c["bone"], c["type"]) for c in plan.constraints],
+            [("DEF-spine.001", "COPY_LOCATION"), ("DEF-spine.001", "STRETCH_TO"), ("DEF-spine.002", "STRETCH_TO")],
+        )
+        self.assertEqual(plan.bbone_bones, ["DEF-spine.001", "DEF-spine.002"])
+        self.assertEqual({spec.chain for spec in plan.bones}, {"DEF-spine.001"})
+
+    def test_torso_chain(self):
+        plan = rig_plan.plan_torso_chain(spine(3), fkhinge=True)
+        self.assertEqual(plan.created, [
+            "TWK-spine.001", "COG", "Hips",
+            "TWK-spine.002", "ORG-spine.002", "FK-spine.002", "MCH-spine.002",
+            "TWK-spine.003", "ORG-spine.003", "FK-spine.003", "TWK-top",
+        ])
+        self.assertIn(("Hips", "COG"), plan.parents)
+        self.assertIn(("FK-spine.002", "MCH-spine.002"), plan.parents)
+        self.assertIn(("TWK-top", "ORG-spine.003"), plan.parents)
+        self.assertIn(
+            dict(bone="MCH-spine.002", type="COPY_ROTATION", subtarget="COG", space="WORLD", influence=1.0, name=None),
+            plan.constraints,
+        )
+
+    def test_torso_chain_without_hinge(self):
+        plan = rig_plan.plan_torso_chain(spine(3))
+        self.assertNotIn("MCH-spine.002", plan.created)
+
+    def test_single_control(self):
+        plan = rig_plan.plan_single_control(spine(1))
+        self.assertEqual(plan.created, ["CTRL-spine.001"])
+        self.assertEqual(plan.parents, [("DEF-spine.001", "CTRL-spine.001")])
+        self.assertEqual(plan.bones[0].tail, (0.0, 0.0, 0.15))
+
+        plan = rig_plan.plan_single_control(spine(1), copy_transforms=True)
+        self.assertEqual(plan.module, "single_control_constraint")
+        self.assertEqual(plan.parents, [])
+        self.assertEqual(plan.constraints[0]["type"], "COPY_TRANSFORMS")
+
+    def test_new_bone_points_along_input_bone(self):
+        plan = rig_plan.RigPlan("test")
+        bone = rig_plan.ChainBone("bone", (0.0, 0.0, 0.0), (2.0, 0.0, 0.0))
+        spec = plan.new_bone(bone, "FK", bone.head, 0.1, 0.5)
+        self.assertEqual(spec.tail, (0.5, 0.0, 0.0))
+
+        spec = plan.new_bone(bone, "CTRL", bone.head, 0.1, 0.5, align_world=True)
+        self.assertEqual(spec.tail, (0.0, 0.0, 0.5))
+
+
+class TestDiffPlan(unittest.TestCase):
+
+    def test_first_run_creates_everything(self):
+        plan = rig_plan.plan_single_bbone(spine(3))
+        diff = rig_plan.diff_plan(plan, {})
+        self.assertEqual([spec.name for spec in diff.create], plan.created)
+        self.assertEqual((diff.update, diff.unchanged, diff.delete), ([], [], []))
+
+    def test_self_diff_is_unchanged(self):
+        plan = rig_plan.plan_torso_chain(spine(4), fkhinge=True)
+        diff = rig_plan.diff_plan(plan, existing_state(plan))
+        self.assertEqual([spec.name for spec, _name in diff.unchanged], plan.created)
+        self.assertEqual((diff.create, diff.update, diff.delete), ([], [], []))
+
+    def test_moved_bone_is_updated(self):
+        plan = rig_plan.plan_single_bbone(spine(2))
+        existing = existing_state(plan)
+        key = rig_plan.bone_key(plan.module, plan.bones[0])
+        existing[key]["head"] = (1.0, 0.0, 0.0)
+        diff = rig_plan.diff_plan(plan, existing)
+        self.assertEqual([(spec.name, name) for spec, name in diff.update], [(plan.bones[0].name, plan.bones[0].name)])
+
+    def test_renamed_bone_keeps_its_name(self):
+        plan = rig_plan.plan_single_control(spine(1))
+        existing = existing_state(plan)
+        existing[rig_plan.bone_key(plan.module, plan.bones[0])]["name"] = "CTRL-spine.001.001"
+        diff = rig_plan.diff_plan(plan, existing)
+        self.assertEqual(diff.names, {"CTRL-spine.001": "CTRL-spine.001.001"})
+        self.assertEqual(len(diff.unchanged), 1)
+
+    def test_shorter_chain_deletes_extra_bones(self):
+        long_plan = rig_plan.plan_single_bbone(spine(3))
+        plan = rig_plan.plan_single_bbone(spine(2))
+        diff = rig_plan.diff_plan(plan, existing_state(long_plan))
+        self.assertEqual(sorted(diff.delete), ["FK-spine.003", "endHandle-spine.003"])
+        self.assertEqual(diff.create, [])
+
+    def test_other_chains_are_kept(self):
+        plan = rig_plan.plan_single_bbone(spine(2))
+        other = rig_plan.plan_single_bbone(rig_plan.chain_from_dicts([
+            dict(name="DEF-tail", head=(1.0, 0.0, 0.0), tail=(1.0, 0.0, 1.0)),
+        ]))
+        diff = rig_plan.diff_plan(plan, existing_state(other))
+        self.assertEqual(diff.delete, [])
+        self.assertEqual(len(diff.create), len(plan.bones))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Tests that the generated widgets match the shapes in armature_presets/widgets.blend."""
+
+from pathlib import Path
+import importlib.util
+import unittest
+
+import numpy as np
+
+from blend_reader import BlendFile
+
+ROOT = Path(__file__).resolve().parent.parent
+_spec = importlib.util.spec_from_file_location("widget_geometry", ROOT / "rig_modules" / "widget_geometry.py")
+widget_geometry = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(widget_geometry)
+
+# Library shapes are measured once, reading the file takes longer than the tests.
+LIBRARY = BlendFile(ROOT / "armature_presets" / "widgets.blend").object_vertices()
+# Generated shapes use fewer or more segments than the library, allow for that.
+TOLERANCE = 0.01
+
+
+class TestWidgetGeometry(unittest.TestCase):
+
+    def test_shapes_are_in_the_library(self):
+        self.assertLessEqual(set(widget_geometry.SHAPES), set(LIBRARY))
+
+    def test_extents_match_the_library(self):
+        for name in widget_geometry.SHAPES:
+            with self.subTest(name):
+                verts, _edges = widget_geometry.build(name)
+                library = np.array(LIBRARY[name], dtype=np.float32)
+                np.testing.assert_allclose(verts.min(axis=0), library.min(axis=0), atol=TOLERANCE)
+                np.testing.assert_allclose(verts.max(axis=0), library.max(axis=0), atol=TOLERANCE)
+
+    def test_edges_are_valid(self):
+        for name in widget_geometry.SHAPES:
+            with self.subTest(name):
+                verts, edges = widget_geometry.build(name)
+                self.assertEqual(edges.shape[1], 2)
+                self.assertTrue(((edges >= 0) & (edges < len(verts))).all())
+                # Every vertex is drawn.
+                self.assertEqual(len(np.unique(edges)), len(verts))
+
+
+if __name__ == "__main__":
+    unittest.main()
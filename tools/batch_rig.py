@@ -0,0 +1,137 @@
+"""Rigs a list of .blend files with a pool of background Blender workers.
+
+Usage:
+    python batch_rig.py jobs.json --blender /path/to/blender --workers 4 --report report.json
+
+jobs.json holds one entry per file. Steps run in order, 'bones' selects the chain
+for the edit mode modules and 'properties' are passed to the operator:
+
+    {
+        "jobs": [
+            {
+                "file": "characters/bob.blend",
+                "output": "rigged/bob.blend",
+                "armature": "bob-RIG",
+                "steps": [
+                    {"operator": "set_armature_properties"},
+                    {"operator": "create_torso_chain", "bones": ["DEF-spine.001", "DEF-spine.002"]},
+                    {"operator": "create_single_bbone", "bones": ["DEF-tail.001", "DEF-tail.002"]}
+                ]
+            }
+        ]
+    }
+
+Relative paths are resolved from the folder of jobs.json. Without 'output' the file
+is saved in place.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+WORKER = Path(__file__).resolve().parent / "batch_worker.py"
+
+
+def resolve_job(job: dict, root: Path) -> dict:
+    """Returns a copy of job with absolute file and output paths."""
+
+    job = dict(job)
+    for key in ("file", "output"):
+        if job.get(key):
+            job[key] = str((root / job[key]).resolve())
+    if job.get("output"):
+        Path(job["output"]).parent.mkdir(parents=True, exist_ok=True)
+    return job
+
+
+def run_blender(blender: str, blend_file: str | None, script: Path, payload: dict, timeout: float | None) -> dict:
+    """Runs script in a background Blender with payload as its job, returns the worker result.
+
+    Without blend_file Blender starts with its factory startup file. Worker failures
+    (crash, timeout, no result) are returned as an error entry.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="rigtoolkit_") as tmp:
+        job_path = Path(tmp) / "job.json"
+        result_path = Path(tmp) / "result.json"
+        job_path.write_text(json.dumps(payload))
+        command = [
+            blender, "-b", *([blend_file] if blend_file else []), "--factory-startup",
+            "--python", str(script), "--", str(job_path), str(result_path),
+        ]
+        start = time.perf_counter()
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"file": blend_file, "error": f"Timed out after {timeout} seconds", "steps": []}
+        except OSError as error:
+            return {"file": blend_file, "error": f"Could not start Blender: {error}", "steps": []}
+
+        if result_path.exists():
+            result = json.loads(result_path.read_text())
+        else:
+            result = {"file": blend_file, "error": "Worker did not write a result", "steps": []}
+            result["stderr"] = process.stderr[-2000:]
+        result["returncode"] = process.returncode
+        result["wall_seconds"] = time.perf_counter() - start
+        return result
+
+
+def run_pool(blender: str, jobs: list, script: Path, workers: int, timeout: float | None) -> list:
+    """Spreads jobs over a pool of Blender processes, returns results in job order.
+
+    Jobs are printed by their 'name', or their 'file' without one.
+    """
+
+    results: list = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_blender, blender, job.get("file"), script, job, timeout): index
+            for index, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            status = "ERROR" if results[index].get("error") else "OK"
+            label = jobs[index].get("name", jobs[index].get("file"))
+            print(f"[{status}] {label} ({results[index].get('wall_seconds', 0.0):.2f}s)")
+    return results
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rig .blend files in background Blender workers.")
+    parser.add_argument("jobs", type=Path, help="JSON file with the jobs description.")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a worker is stopped.")
+    parser.add_argument("--report", type=Path, default=Path("batch_report.json"))
+    args = parser.parse_args(argv)
+
+    description = json.loads(args.jobs.read_text())
+    root = args.jobs.resolve().parent
+    jobs = [resolve_job(job, root) for job in description["jobs"]]
+
+    start = time.perf_counter()
+    results = run_pool(args.blender, jobs, WORKER, args.workers, args.timeout)
+    failed = [result for result in results if result.get("error")]
+
+    report = {
+        "workers": args.workers,
+        "seconds": time.perf_counter() - start,
+        "files": len(results),
+        "failed": len(failed),
+        "results": results,
+    }
+    args.report.write_text(json.dumps(report, indent=2))
+    print(f"{len(results) - len(failed)}/{len(results)} files rigged, report in '{args.report}'")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Runs a rigging job inside a background Blender.
+
+Started by batch_rig.py as:
+    blender -b <file.blend> --factory-startup --python batch_worker.py -- <job.json> <result.json>
+"""
+
+from pathlib import Path
+import importlib.util
+import json
+import sys
+import time
+import traceback
+
+import bpy
+
+ADDON_DIR = Path(__file__).resolve().parent.parent
+ADDON_MODULE = "rigging_toolkit"
+
+# Operators that run on the selected edit bones of the armature.
+EDIT_OPERATORS: set = {
+    "create_single_bbone",
+    "create_torso_chain",
+    "create_single_control",
+    "create_single_control_constraint",
+}
+# Operators that work in any mode.
+MODELESS_OPERATORS: set = {
+    "set_armature_properties",
+}
+
+
+def register_addon():
+    """Imports the add-on from this checkout and registers it."""
+
+    if ADDON_MODULE in sys.modules:
+        return sys.modules[ADDON_MODULE]
+    spec = importlib.util.spec_from_file_location(
+        ADDON_MODULE,
+        ADDON_DIR / "__init__.py",
+        submodule_search_locations=[str(ADDON_DIR)],
+    )
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_MODULE] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+
+def set_mode(armature, mode: str) -> None:
+    with bpy.context.temp_override(active_object=armature, object=armature):
+        if armature.mode != mode:
+            bpy.ops.object.mode_set(mode=mode)
+
+
+def run_step(armature, step: dict) -> None:
+    """Runs one operator of the job, selecting step['bones'] for chain modules."""
+
+    operator_name = step["operator"]
+    operator = getattr(bpy.ops.rigtoolkit, operator_name)
+    properties = step.get("properties", {})
+    bone_names = step.get("bones", [])
+
+    if operator_name not in EDIT_OPERATORS:
+        if operator_name not in MODELESS_OPERATORS:
+            set_mode(armature, "OBJECT")
+        with bpy.context.temp_override(active_object=armature, object=armature, selected_objects=[armature]):
+            result = operator(**properties)
+    else:
+        missing = [name for name in bone_names if name not in armature.data.bones]
+        if missing:
+            raise ValueError(f"Bones not in '{armature.name}': {', '.join(missing)}")
+
+        set_mode(armature, "EDIT")
+        edit_bones = armature.data.edit_bones
+        for bone in edit_bones:
+            bone.select = bone.select_head = bone.select_tail = bone.name in bone_names
+        selected_edit = [edit_bones[name] for name in bone_names]
+        # Pose channels survive the edit -> pose switch made by the operator.
+        selected_pose = [armature.pose.bones[name] for name in bone_names]
+
+        with bpy.context.temp_override(
+            active_object=armature,
+            object=armature,
+            edit_object=armature,
+            selected_editable_bones=selected_edit,
+            selected_pose_bones=selected_pose,
+        ):
+            result = operator(**properties)
+
+    if "FINISHED" not in result:
+        raise RuntimeError(f"'{operator_name}' returned {set(result)}")
+
+
+def run_job(job: dict) -> dict:
+    """Runs all the steps of a job and saves the file, returns timings and errors.
+
+    The rig modules of the steps are applied together at the end, with one Edit Mode
+    and one Pose Mode pass. Step timings only cover checks and planning, the passes
+    are timed in 'passes_seconds'.
+    """
+
+    report: dict = {"file": bpy.data.filepath, "steps": [], "error": None}
+    start = time.perf_counter()
+    try:
+        register_addon()
+        mode_passes = sys.modules[f"{ADDON_MODULE}.rig_modules.mode_passes"]
+        armature = bpy.data.objects.get(job["armature"])
+        if not armature or armature.type != "ARMATURE":
+            raise ValueError(f"There is no armature named '{job['armature']}'")
+        bpy.context.view_layer.objects.active = armature
+
+        with mode_passes.mode_passes(bpy.context) as passes:
+            for step in job.get("steps", []):
+                step_start = time.perf_counter()
+                entry: dict = {"operator": step["operator"], "error": None}
+                report["steps"].append(entry)
+                try:
+                    run_step(armature, step)
+                except Exception as error:
+                    entry["error"] = f"{type(error).__name__}: {error}"
+                    raise
+                finally:
+                    entry["seconds"] = time.perf_counter() - step_start
+            passes_start = time.perf_counter()
+        report["passes_seconds"] = time.perf_counter() - passes_start
+        report["mode_switches"] = passes.switches
+
+        set_mode(armature, "OBJECT")
+        output = job.get("output") or bpy.data.filepath
+        bpy.ops.wm.save_as_mainfile(filepath=str(output), copy=output != bpy.data.filepath)
+        report["output"] = str(output)
+    except Exception as error:
+        report["error"] = f"{type(error).__name__}: {error}"
+        report["traceback"] = traceback.format_exc()
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    job_path, result_path = argv[0], argv[1]
+    job = json.loads(Path(job_path).read_text())
+    report = run_job(job)
+    Path(result_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measures how the rig operators scale on synthetic armatures.
+
+Usage:
+    python benchmark.py --blender /path/to/blender --results results.json --baseline baseline.json
+
+Every operator runs once per bone count in its own background Blender, see
+benchmark_worker.py, with the worker pool of batch_rig.py. Results hold the wall time,
+peak memory and datablock counts of each case. With --baseline the results are compared
+against a stored run and the script exits with 1 when a case got slower or bigger than
+the tolerance allows. --save-baseline stores the results as the new baseline.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from batch_rig import run_pool
+
+WORKER = Path(__file__).resolve().parent / "benchmark_worker.py"
+OPERATORS: tuple = (
+    "create_single_bbone",
+    "create_torso_chain",
+    "create_single_control",
+    "parenting_to_bones",
+    "set_bone_custom_properties",
+)
+SIZES: tuple = (10, 100, 1000, 10000)
+# Differences under these are noise, whatever the ratio.
+MIN_SECONDS = 0.05
+MIN_MEMORY_MB = 16.0
+
+
+def case_name(case: dict) -> str:
+    return f"{case['operator']}[{case['bones']}]"
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Regressions of results against baseline, as readable lines.
+
+    A case regresses when its time or peak memory delta grows more than tolerance
+    (0.25 = 25%) and more than the noise floor, when it adds more datablocks, or when
+    it fails and the baseline didn't.
+    """
+
+    previous = {case_name(case): case for case in baseline}
+    regressions: list = []
+    for case in results:
+        name = case_name(case)
+        old = previous.get(name)
+        if old is None:
+            continue
+        if case.get("error"):
+            if not old.get("error"):
+                regressions.append(f"{name}: fails with {case['error']}")
+            continue
+        if old.get("error"):
+            continue
+
+        seconds, old_seconds = case["seconds"], old["seconds"]
+        if seconds > old_seconds * (1 + tolerance) and seconds - old_seconds > MIN_SECONDS:
+            regressions.append(f"{name}: {old_seconds:.3f}s -> {seconds:.3f}s")
+
+        memory, old_memory = case["peak_memory_delta_mb"], old["peak_memory_delta_mb"]
+        if memory > old_memory * (1 + tolerance) and memory - old_memory > MIN_MEMORY_MB:
+            regressions.append(f"{name}: peak memory +{old_memory:.1f}MB -> +{memory:.1f}MB")
+
+        for datablock, count in case["datablocks_added"].items():
+            old_count = old["datablocks_added"].get(datablock, 0)
+            if count > old_count:
+                regressions.append(f"{name}: {datablock} added {old_count} -> {count}")
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the rig operators on synthetic armatures.")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Blender executable.")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel Blenders, 1 keeps timings comparable.")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a case is stopped.")
+    parser.add_argument("--operators", nargs="+", default=list(OPERATORS), choices=OPERATORS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="Bone counts.")
+    parser.add_argument("--results", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, default=None, help="Results to compare against.")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Store the results as a baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed growth, 0.25 = 25%%.")
+    args = parser.parse_args(argv)
+
+    jobs = [
+        {"name": f"{operator}[{size}]", "operator": operator, "bones": size}
+        for operator in args.operators
+        for size in args.sizes
+    ]
+    start = time.perf_counter()
+    results = run_pool(args.blender, jobs, WORKER, args.workers, args.timeout)
+    for job, result in zip(jobs, results):
+        # Workers that crashed don't say which case they ran.
+        result.setdefault("operator", job["operator"])
+        result.setdefault("bones", job["bones"])
+
+    report = {"seconds": time.perf_counter() - start, "cases": results}
+    args.results.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+
+    failed = [result for result in results if result.get("error")]
+    print(f"{len(results) - len(failed)}/{len(results)} cases ran, results in '{args.results}'")
+    if not args.baseline:
+        return 1 if failed else 0
+
+    baseline = json.loads(args.baseline.read_text())["cases"]
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"[REGRESSION] {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
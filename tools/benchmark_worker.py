@@ -0,0 +1,108 @@
+"""Runs one benchmark case inside a background Blender.
+
+Started by benchmark.py as:
+    blender -b --factory-startup --python benchmark_worker.py -- <job.json> <result.json>
+
+The job names an operator and a bone count. The worker builds a synthetic armature,
+runs the operator once through batch_worker.run_step and writes wall time, peak memory
+and datablock counts.
+"""
+
+from pathlib import Path
+import json
+import resource
+import sys
+import time
+import traceback
+
+import bpy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import batch_worker  # noqa: E402
+
+# Bones per chain of the synthetic armatures.
+CHAIN_LENGTH = 10
+# Operators that get unconnected bones, the others get connected chains.
+UNCONNECTED: set = {"create_single_control", "create_single_control_constraint"}
+DATABLOCKS: tuple = ("objects", "meshes", "armatures", "collections", "materials", "texts")
+
+
+def synthetic_armature(bone_count: int, connected: bool):
+    """Armature object with bone_count deform bones in chains of CHAIN_LENGTH along Y,
+    one chain per X column, and a 'Properties' bone."""
+
+    armature_data = bpy.data.armatures.new("bench-data")
+    armature = bpy.data.objects.new("bench-RIG", armature_data)
+    bpy.context.scene.collection.objects.link(armature)
+    bpy.context.view_layer.objects.active = armature
+    batch_worker.set_mode(armature, "EDIT")
+
+    edit_bones = armature_data.edit_bones
+    parent = None
+    for index in range(bone_count):
+        chain, link = divmod(index, CHAIN_LENGTH)
+        bone = edit_bones.new(f"DEF-bone_{chain:04d}.{link:03d}")
+        bone.head = (chain * 0.5, link * 0.2, 0.0)
+        bone.tail = (chain * 0.5, link * 0.2 + (0.2 if connected else 0.1), 0.0)
+        bone.use_deform = True
+        if link and connected:
+            bone.parent = parent
+            bone.use_connect = True
+        parent = bone
+    properties = edit_bones.new("Properties")
+    properties.tail = (0.0, 0.0, 0.2)
+    properties.use_deform = False
+
+    batch_worker.set_mode(armature, "OBJECT")
+    return armature
+
+
+def datablock_counts() -> dict:
+    return {name: len(getattr(bpy.data, name)) for name in DATABLOCKS}
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process. ru_maxrss is in KB on Linux, bytes on macOS."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(job: dict) -> dict:
+    operator = job["operator"]
+    bone_count = job["bones"]
+    result: dict = {"operator": operator, "bones": bone_count, "error": None}
+    try:
+        batch_worker.register_addon()
+        armature = synthetic_armature(bone_count, connected=operator not in UNCONNECTED)
+        step = {"operator": operator, "properties": job.get("properties", {})}
+        if operator in batch_worker.EDIT_OPERATORS:
+            step["bones"] = [bone.name for bone in armature.data.bones if bone.name != "Properties"]
+
+        before = datablock_counts()
+        memory_before = peak_memory_mb()
+        start = time.perf_counter()
+        batch_worker.run_step(armature, step)
+        result["seconds"] = time.perf_counter() - start
+        result["peak_memory_mb"] = peak_memory_mb()
+        result["peak_memory_delta_mb"] = result["peak_memory_mb"] - memory_before
+
+        after = datablock_counts()
+        result["datablocks"] = after
+        result["datablocks_added"] = {name: after[name] - before[name] for name in DATABLOCKS}
+        result["bones_after"] = len(armature.data.bones)
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+    return result
+
+
+def main() -> None:
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    job_path, result_path = argv[0], argv[1]
+    job = json.loads(Path(job_path).read_text())
+    Path(result_path).write_text(json.dumps(run_case(job), indent=2))
+
+
+if __name__ == "__main__":
+    main()
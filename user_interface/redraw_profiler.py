@@ -0,0 +1,107 @@
+"""Debug timing of the poll and draw of the toolkit panels.
+
+enable() wraps poll, draw and draw_header of the given panel classes and keeps the
+last WINDOW timings of each. disable() puts the original methods back, the panels
+run untouched while it is off.
+"""
+
+from collections import deque
+import functools
+import time
+
+WINDOW = 240
+# Time the toolkit panels together should stay under per redraw, in milliseconds.
+BUDGET_MS = 1.0
+METHODS: tuple = ("poll", "draw", "draw_header")
+
+# (panel idname, method) -> deque of seconds.
+samples: dict = {}
+# (class, method name) -> original attribute in the class, None if it was inherited.
+_originals: dict = {}
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def _record(key: tuple, seconds: float) -> None:
+    window = samples.get(key)
+    if window is None:
+        window = samples[key] = deque(maxlen=WINDOW)
+    window.append(seconds)
+
+
+def _defined(cls, name: str) -> bool:
+    """True when a Python class of the panel, not bpy.types.Panel, defines name."""
+
+    return any(name in base.__dict__ for base in cls.__mro__ if base.__module__ not in ("bpy.types", "bpy_types"))
+
+
+def _timed_poll(key: tuple, func):
+    @functools.wraps(func)
+    def poll(cls, context):
+        start = time.perf_counter()
+        try:
+            return func(context)
+        finally:
+            _record(key, time.perf_counter() - start)
+    return classmethod(poll)
+
+
+def _timed_draw(key: tuple, func):
+    @functools.wraps(func)
+    def draw(self, context):
+        start = time.perf_counter()
+        try:
+            return func(self, context)
+        finally:
+            _record(key, time.perf_counter() - start)
+    return draw
+
+
+def enable(panel_classes: list) -> None:
+    """Starts timing the poll and draw methods of panel_classes."""
+
+    if is_enabled():
+        disable()
+    samples.clear()
+    for cls in panel_classes:
+        for name in METHODS:
+            if not _defined(cls, name):
+                continue
+            _originals[(cls, name)] = cls.__dict__.get(name)
+            key = (cls.bl_idname if hasattr(cls, "bl_idname") else cls.__name__, name)
+            if name == "poll":
+                # Bound to cls, so inherited polls keep their class.
+                setattr(cls, name, _timed_poll(key, getattr(cls, name)))
+            else:
+                setattr(cls, name, _timed_draw(key, getattr(cls, name)))
+
+
+def disable() -> None:
+    """Puts the original methods back."""
+
+    for (cls, name), original in _originals.items():
+        if original is None:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, original)
+    _originals.clear()
+
+
+def worst(count: int = 10) -> list:
+    """(panel, method, mean ms, max ms, samples) of the slowest methods by mean time."""
+
+    rows = [
+        (panel, method, sum(window) / len(window) * 1000.0, max(window) * 1000.0, len(window))
+        for (panel, method), window in samples.items()
+        if window
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:count]
+
+
+def redraw_ms() -> float:
+    """Mean time of one redraw of all the timed panels, the sum of their method means."""
+
+    return sum(row[2] for row in worst(len(samples)))
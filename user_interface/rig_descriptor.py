@@ -0,0 +1,174 @@
+from bpy.app.handlers import persistent
+from bpy.types import Context, Object
+import bpy
+
+
+SIDES: tuple = (".L", ".R", ".C", ".top", ".bot")
+
+
+def split_side(property_name: str) -> tuple:
+    """Splits a side suffix from a property name, 'arm-mask.L' -> ('arm-mask', '.L')."""
+
+    for side in SIDES:
+        if property_name.endswith(side):
+            return property_name[: -len(side)], side
+    return property_name, ""
+
+
+class RigDescriptor:
+    """Stores what the custom properties panels need to know about an armature.
+
+    It is built once per armature and properties bone, and shared by all the panels
+    until the properties bone is added, removed or its property names change, or a
+    file load or undo frees the armature. Property names are indexed
+    by family ('-IK|FK', 'Foot Roll', ...) and side ('.L', '.R', ... or '' if none).
+    """
+
+    def __init__(self, armature: Object, source_bone: str, families: tuple = ()) -> None:
+        pbone = armature.pose.bones.get(source_bone)
+        self.armature = armature
+        self.source_bone = source_bone
+        self.has_properties_bone = pbone is not None
+        self.property_names = frozenset(pbone.keys()) if pbone else frozenset()
+        self._index: dict = {}
+        # Data resolved by panels from this descriptor, e.g. rows to draw.
+        self.resolved: dict = {}
+        for family in families:
+            self._index[family] = self._family_sides(family)
+
+    def __str__(self) -> str:
+        return f"Source Bone: {self.source_bone}, Properties bone: {self.has_properties_bone}, Properties: {len(self.property_names)}"
+
+    def _family_sides(self, family: str) -> dict:
+        sides: dict = {}
+        for name in self.property_names:
+            base, side = split_side(name)
+            if family in base:
+                sides.setdefault(side, set()).add(name)
+        return {side: frozenset(names) for side, names in sides.items()}
+
+    def is_current(self) -> bool:
+        """False when the properties bone was added, removed or its properties changed."""
+
+        pose = self.armature.pose
+        pbone = pose.bones.get(self.source_bone) if pose else None
+        if pbone is None:
+            return not self.has_properties_bone
+        return self.has_properties_bone and self.property_names == frozenset(pbone.keys())
+
+    def sides(self, family: str) -> dict:
+        """Returns side -> property names of a family. Unknown families are indexed on first use."""
+
+        if family not in self._index:
+            self._index[family] = self._family_sides(family)
+        return self._index[family]
+
+    def has_family(self, family: str) -> bool:
+        """Check if any custom property of the family exists, e.g. '-IK|FK' or 'Foot Roll'.
+
+        :param family: part of the name shared by the properties of a family.
+        :type family: str
+        :return: True if there is a property in the family.
+        :rtype: bool
+        """
+        return bool(self.sides(family))
+
+    def has_property(self, property_name: str, family: str) -> bool:
+        """Check if a property exists and belongs to family.
+
+        :param property_name: full name of the property, e.g. 'arm-IK|FK.L'
+        :type property_name: str
+        :param family: family of the property, e.g. '-IK|FK'
+        :type family: str
+        :return: True if property is in the family index.
+        :rtype: bool
+        """
+        names = self.sides(family).get(split_side(property_name)[1])
+        return bool(names) and property_name in names
+
+
+# Armature object pointer, properties bone -> RigDescriptor.
+_descriptors: dict = {}
+
+
+def get_descriptor(context: Context, source_bone: str, families: tuple = ()) -> RigDescriptor:
+    """Returns the cached descriptor of the active armature, building it if needed.
+
+    families are indexed up front when the descriptor is built.
+    """
+
+    armature = context.active_object
+    key = (armature.as_pointer(), source_bone)
+    descriptor = _descriptors.get(key)
+    if descriptor is None:
+        descriptor = _descriptors[key] = RigDescriptor(armature, source_bone, families)
+    return descriptor
+
+
+def invalidate(armature: Object | None = None) -> None:
+    """Drops cached descriptors of an armature object, or all of them if none is given."""
+
+    if armature is None:
+        _descriptors.clear()
+        return
+    pointer = armature.as_pointer()
+    for key in [key for key in _descriptors if key[0] == pointer]:
+        del _descriptors[key]
+
+
+def drop_stale() -> None:
+    """Drops the descriptors whose properties bone changed, see RigDescriptor.is_current."""
+
+    for key in [key for key, descriptor in _descriptors.items() if not descriptor.is_current()]:
+        del _descriptors[key]
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph) -> None:
+    """Drops stale descriptors when an armature object or armature data changes.
+
+    Moving an armature object in Object Mode is a transform only update and is skipped.
+    Posing bones sends updates all the time, so descriptors are compared with their
+    properties bone instead of being dropped on every update.
+    """
+
+    if not _descriptors:
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, Object):
+            if update.id.type != "ARMATURE":
+                continue
+            if update.is_updated_transform and not update.is_updated_geometry:
+                continue
+        elif not isinstance(update.id, bpy.types.Armature):
+            continue
+        drop_stale()
+        return
+
+
+@persistent
+def on_file_change(*args) -> None:
+    """Undo and file loading reallocate data, so pointers are not valid anymore."""
+
+    invalidate()
+
+
+handlers: tuple = (
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+    (bpy.app.handlers.load_post, on_file_change),
+    (bpy.app.handlers.undo_post, on_file_change),
+    (bpy.app.handlers.redo_post, on_file_change),
+)
+
+
+def register_handlers() -> None:
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+
+def unregister_handlers() -> None:
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
+    invalidate()
@@ -1,5 +1,8 @@
 from bpy.types import Context, Panel
 import bpy
+from ..operators import instrumentation
+from ..operators import op_rig_profiler
+from . import redraw_profiler
 
 class MainAccessArmatureSetting(Panel):
     bl_space_type = "PROPERTIES"
@@ -28,6 +31,32 @@ class DATA_PT_ArmatureSettings(MainAccessArmatureSetting, Panel):
             "rigtoolkit.set_bone_custom_properties",
             text="Custom Bone Settings",
         )
+        col.operator(
+            "rigtoolkit.set_custom_property_drivers",
+            text="Custom Property Drivers",
+        )
+        row = col.row(align=True)
+        row.operator(
+            "rigtoolkit.audit_drivers",
+            text="Audit Drivers",
+        ).rewrite = False
+        row.operator(
+            "rigtoolkit.audit_drivers",
+            text="Rewrite Drivers",
+        ).rewrite = True
+        col.operator(
+            "rigtoolkit.profile_rig",
+            text="Profile Rig",
+            icon="TIME",
+        )
+        col.operator(
+            "rigtoolkit.toggle_instrumentation",
+            text="Stop Instrumentation" if instrumentation.is_enabled() else "Start Instrumentation",
+        )
+        col.operator(
+            "rigtoolkit.toggle_redraw_profiler",
+            text="Stop Redraw Profiler" if redraw_profiler.is_enabled() else "Start Redraw Profiler",
+        )
         col.operator(
             "rigtoolkit.create_single_bbone",
             text="Single Bbone Chain",
@@ -49,3 +78,26 @@ class DATA_PT_ArmatureSettings(MainAccessArmatureSetting, Panel):
             text="Torso Chain",
         )
 
+
+class DATA_PT_RigProfile(MainAccessArmatureSetting, Panel):
+    bl_label = "Rig Profile"
+    bl_idname = "DATA_PT_RigProfile"
+    bl_parent_id = "DATA_PT_ArmatureSettings"
+
+    # Rows drawn from the report, the full report is in the JSON file.
+    max_rows = 8
+
+    @classmethod
+    def poll(cls, context: Context):
+        return context.armature and context.object.name in op_rig_profiler.last_reports
+
+    def draw(self, context: Context):
+        report = op_rig_profiler.last_reports[context.object.name]
+        layout = self.layout
+        layout.label(text=f"{report['frame_ms']:.2f} ms per frame over {report['frames']} frames")
+        col = layout.column(align=True)
+        for group in report["groups"][:self.max_rows]:
+            row = col.row()
+            row.label(text=group["group"])
+            row.label(text=f"{group['count']}")
+            row.label(text=f"{group['ms']:.3f} ms")
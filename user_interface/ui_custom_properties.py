@@ -1,4 +1,9 @@
+from bpy.app.handlers import persistent
 from bpy.types import Context, Panel
+from bpy.utils import register_class, unregister_class
+import bpy
+from .rig_descriptor import RigDescriptor, get_descriptor, split_side
+from . import redraw_profiler
 
 
 class ArmaturePanel(Panel):
@@ -35,6 +40,18 @@ class ArmaturePanel(Panel):
         "top": ".top",
         "bot": ".bot",
     }
+    ac_families = (
+        ac_ikfk_bone,
+        ac_fk_hinge_bone,
+        ac_mask_prop,
+        ac_foot_roll,
+        ac_rhose,
+        ac_ik_pole,
+        ac_ik_stretch,
+        ac_mouth_zip,
+        ac_teeth_follow,
+        ac_sticky_eye,
+    )
 
     @classmethod
     def poll(cls, context: Context) -> bool:
@@ -50,6 +67,17 @@ class ArmaturePanel(Panel):
             return context.active_object.type == "ARMATURE"
         return False
 
+    @classmethod
+    def rig(cls, context: Context) -> RigDescriptor:
+        """Cached descriptor of the active armature shared by all panels.
+
+        :param context: .active_object
+        :type context: Context
+        :return: descriptor for the properties bone of the active armature.
+        :rtype: RigDescriptor
+        """
+        return get_descriptor(context, cls.ac_custom_bone, cls.ac_families)
+
     @staticmethod
     def is_bone(bone_name: str, context: Context) -> bool:
         """Check if bone exists in armature object.
@@ -61,7 +89,7 @@ class ArmaturePanel(Panel):
         :return: bone name if it is in armature object.
         :rtype: bool
         """
-        if bone_name in set(bone.name for bone in context.active_object.data.bones):
+        if context.active_object.data.bones.get(bone_name):
             return bone_name
 
     @staticmethod
@@ -79,11 +107,7 @@ class ArmaturePanel(Panel):
         :return: property name if it is in custom property bone
         :rtype: str
         """
-        if property_name in {
-            _
-            for _ in context.active_object.pose.bones[source_bone].keys()
-            if property_suffix in _
-        }:
+        if get_descriptor(context, source_bone).has_property(property_name, property_suffix):
             return property_name
 
     @staticmethod
@@ -101,13 +125,7 @@ class ArmaturePanel(Panel):
         :return: True if there is a property with the property_suffix, False if not.
         :rtype: bool
         """
-        return bool(
-            {
-                _
-                for _ in context.active_object.pose.bones[source_bone].keys()
-                if property_suffix in _
-            }
-        )
+        return get_descriptor(context, source_bone).has_family(property_suffix)
 
     def draw_custom_property(
         self, custom_prop: str, context: Context, text: str, split
@@ -177,669 +195,316 @@ class VIEW3D_PT_CustomBonePropertiesUI(ArmaturePanel, Panel):
         )
 
 
-class VIEW3D_PT_IkFkSwitchUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'IK|FK Switch' properties. A child of 'Custom Properties Settings' Tab. """
-
-    bl_label = "IK|FK Switch"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_IkFkSwitchUI"
-    bl_parent_id = "VIEW3D_PT_CustomBonePropertiesUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_ikfk_bone)
-        )
-
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_ikfk_bone):
-            layout = self.layout
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ikfk_bone}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ikfk_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Arm", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ikfk_bone}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ikfk_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Arm", split=split
-            )
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ikfk_bone}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ikfk_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Leg", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ikfk_bone}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ikfk_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Leg", split=split
-            )
-
-
-class VIEW3D_PT_FkHingeUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'FK Hinge' properties. A child of 'Custom Properties Settings' Tab. """
-
-    bl_label = "FK Hinge"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_FkHingeUI"
-    bl_parent_id = "VIEW3D_PT_CustomBonePropertiesUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_fk_hinge_bone)
-        )
-
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_fk_hinge_bone):
-
-            layout = self.layout
-            split = layout.split()
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"head{self.ac_fk_hinge_bone}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Head", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"neck{self.ac_fk_hinge_bone}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Neck", split=split
-            )
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_fk_hinge_bone}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Arm", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_fk_hinge_bone}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Arm", split=split
-            )
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_fk_hinge_bone}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Leg", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_fk_hinge_bone}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_fk_hinge_bone,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Leg", split=split
-            )
-
-
 # ----- Main Panel -----
-class VIEW3D_PT_LimbSettingsUI(ArmaturePanel, Panel):
-    """ Draws main UI tab for 'Limbs Settings' properties. A child of 'Custom Properties Settings' Tab. """
+class VIEW3D_PT_CharacterSettingsUI(ArmaturePanel, Panel):
+    """ Draws main tab for all properties under the label 'Character Properties'. """
 
-    bl_label = "Limbs Settings"
+    bl_label = "Character Properties"
     bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_LimbSettingsUI"
-    bl_parent_id = "VIEW3D_PT_CustomBonePropertiesUI"
+    bl_idname = "VIEW3D_PT_CharacterSettingsUI"
 
     @classmethod
     def poll(cls, context: Context) -> bool:
-        return super().poll(context) and super().is_bone(cls.ac_custom_bone, context)
-
-    def draw_header(self, context: Context):
-        layout = self.layout
-        layout.label(icon="COLLAPSEMENU")
+        return super().poll(context)
 
     def draw(self, context: Context):
-        pass
-
-
-class VIEW3D_PT_FootRollUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'Foot Roll' properties. A child of 'Limbs Settings' Tab. """
-
-    bl_label = "Foot Roll"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_FootRollUI"
-    bl_parent_id = "VIEW3D_PT_LimbSettingsUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_foot_roll)
+        layout = self.layout
+        layout.label(
+            text=f"{context.active_object.name}",
+            icon="OUTLINER_OB_ARMATURE",
         )
 
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_foot_roll):
-            layout = self.layout
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"{self.ac_foot_roll}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_foot_roll,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Foot Roll",
-                split=split,
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"{self.ac_foot_roll}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_foot_roll,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Foot Roll",
-                split=split,
-            )
 
+class PropertiesPanel(ArmaturePanel):
+    """Panel generated from PANEL_LAYOUT. Draws rows of custom properties.
 
-class VIEW3D_PT_RubberHoselUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'Rubber Hose' properties. A child of 'Limbs Settings' Tab. """
+    -- Generated Values --
+    :ac_rows = rows of (property name, family, text)
+    """
 
-    bl_label = "Rubber Hose"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_RubberHoselUI"
-    bl_parent_id = "VIEW3D_PT_LimbSettingsUI"
+    ac_rows: tuple = ()
 
     @classmethod
     def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_rhose)
-        )
+        return super().poll(context) and cls.rig(context).has_properties_bone
 
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_rhose):
-            layout = self.layout
+    def resolved_rows(self, context: Context) -> list:
+        """Rows of (property name, text) that exist in the properties bone.
 
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_rhose}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_rhose,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Arm Curvature",
-                split=split,
-            )
+        Rows are resolved once per descriptor, so only when bones or properties change.
 
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_rhose}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_rhose,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Arm Curvature",
-                split=split,
-            )
+        :param context: context.active_object
+        :type context: Context
+        :return: rows without missing properties, empty rows are dropped.
+        :rtype: list
+        """
+        descriptor = self.rig(context)
+        rows = descriptor.resolved.get(self.bl_idname)
+        if rows is None:
+            rows = []
+            for row in self.ac_rows:
+                props = tuple(
+                    (prop, text)
+                    for prop, family, text in row
+                    if descriptor.has_property(prop, family)
+                )
+                if props:
+                    rows.append(props)
+            descriptor.resolved[self.bl_idname] = rows
+        return rows
 
+    def draw(self, context: Context):
+        for row in self.resolved_rows(context):
             # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_rhose}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_rhose,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Leg Curvature",
-                split=split,
-            )
+            split = self.layout.split()
+            for custom_prop, text in row:
+                self.draw_custom_property(
+                    custom_prop=custom_prop, context=context, text=text, split=split
+                )
 
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_rhose}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_rhose,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Leg Curvature",
-                split=split,
-            )
 
+class PropertiesHeaderPanel(PropertiesPanel):
+    """Generated panel with an icon in its header."""
 
-# ----- Main Panel -----
-class VIEW3D_PT_IKSettingsUI(ArmaturePanel, Panel):
-    """ Draws main UI tab for 'IK Settings' properties. A child of 'Custom Properties Settings' Tab. """
-
-    bl_label = "IK Settings"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_IKSettingsUI"
-    bl_parent_id = "VIEW3D_PT_CustomBonePropertiesUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return super().poll(context) and super().is_bone(cls.ac_custom_bone, context)
+    ac_header_icon: str = "COLLAPSEMENU"
 
     def draw_header(self, context: Context):
         layout = self.layout
-        layout.label(icon="COLLAPSEMENU")
-
-    def draw(self, context: Context):
-        pass
-
-
-class VIEW3D_PT_IKFollowUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'IK Follow' properties. A child of 'IK Settings' Tab. """
-
-    bl_label = "IK Follow"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_IKFollowUI"
-    bl_parent_id = "VIEW3D_PT_IKSettingsUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_ik_pole)
-        )
-
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_ik_pole):
-            layout = self.layout
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ik_pole}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_pole,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Arm IK",
-                split=split,
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ik_pole}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_pole,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Arm IK",
-                split=split,
-            )
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ik_pole}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_pole,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Leg IK",
-                split=split,
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ik_pole}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_pole,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Leg IK",
-                split=split,
-            )
-
-
-class VIEW3D_PT_IKStretchUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'IK Stretch' properties. A child of 'IK Settings' Tab. """
+        layout.label(icon=self.ac_header_icon)
+
+
+def single(prefix: str, family: str, text: str) -> tuple:
+    """Row entry of a property without side, e.g. 'mouth-zipper'."""
+
+    return ((f"{prefix}{family}", family, text),)
+
+
+def pair(prefix: str, family: str, text: str) -> tuple:
+    """Row of a Left and Right property, e.g. 'arm-IK|FK.L' and 'arm-IK|FK.R'."""
+
+    side = ArmaturePanel.ac_side
+    return (
+        (f"{prefix}{family}{side['left']}", family, f"Left {text}"),
+        (f"{prefix}{family}{side['right']}", family, f"Right {text}"),
+    )
+
+
+_ap = ArmaturePanel
+
+# Panels are registered in this order, parents have to come before their children.
+# label, idname, parent idname, header icon, rows.
+PANEL_LAYOUT: tuple = (
+    ("Face Settings", "VIEW3D_PT_FaceSettingsUI", "VIEW3D_PT_CustomBonePropertiesUI", "COLLAPSEMENU", ()),
+    ("Eyes Settings", "VIEW3D_PT_EyesPropUI", "VIEW3D_PT_FaceSettingsUI", None, (
+        single("eyes", _ap.ac_sticky_eye, "Sticky Eyelips"),
+    )),
+    ("Mouth Settings", "VIEW3D_PT_MouthPropUI", "VIEW3D_PT_FaceSettingsUI", None, (
+        single("mouth", _ap.ac_mouth_zip, "Mouth Zipper") + single("teeth", _ap.ac_teeth_follow, "Teeth Follow Mouth"),
+    )),
+    ("FK Hinge", "VIEW3D_PT_FkHingeUI", "VIEW3D_PT_CustomBonePropertiesUI", None, (
+        single("head", _ap.ac_fk_hinge_bone, "Head") + single("neck", _ap.ac_fk_hinge_bone, "Neck"),
+        pair("arm", _ap.ac_fk_hinge_bone, "Arm"),
+        pair("leg", _ap.ac_fk_hinge_bone, "Leg"),
+    )),
+    ("IK|FK Switch", "VIEW3D_PT_IkFkSwitchUI", "VIEW3D_PT_CustomBonePropertiesUI", None, (
+        pair("arm", _ap.ac_ikfk_bone, "Arm"),
+        pair("leg", _ap.ac_ikfk_bone, "Leg"),
+    )),
+    ("Mask Settings", "VIEW3D_PT_BonesMaskPropUI", "VIEW3D_PT_CharacterSettingsUI", "MOD_MASK", (
+        pair("arm", _ap.ac_mask_prop, "Arm"),
+        pair("leg", _ap.ac_mask_prop, "Leg"),
+    )),
+    ("IK Settings", "VIEW3D_PT_IKSettingsUI", "VIEW3D_PT_CustomBonePropertiesUI", "COLLAPSEMENU", ()),
+    ("Limbs Settings", "VIEW3D_PT_LimbSettingsUI", "VIEW3D_PT_CustomBonePropertiesUI", "COLLAPSEMENU", ()),
+    ("Rubber Hose", "VIEW3D_PT_RubberHoselUI", "VIEW3D_PT_LimbSettingsUI", None, (
+        pair("arm", _ap.ac_rhose, "Arm Curvature"),
+        pair("leg", _ap.ac_rhose, "Leg Curvature"),
+    )),
+    ("Foot Roll", "VIEW3D_PT_FootRollUI", "VIEW3D_PT_LimbSettingsUI", None, (
+        pair("", _ap.ac_foot_roll, "Foot Roll"),
+    )),
+    ("IK Stretch", "VIEW3D_PT_IKStretchUI", "VIEW3D_PT_IKSettingsUI", None, (
+        pair("arm", _ap.ac_ik_stretch, "Arm IK"),
+        pair("leg", _ap.ac_ik_stretch, "Leg IK"),
+    )),
+    ("IK Follow", "VIEW3D_PT_IKFollowUI", "VIEW3D_PT_IKSettingsUI", None, (
+        pair("arm", _ap.ac_ik_pole, "Arm IK"),
+        pair("leg", _ap.ac_ik_pole, "Leg IK"),
+    )),
+)
+
+_panel_classes: list = []
+
+
+def panel_classes() -> list:
+    """Builds the panel classes of PANEL_LAYOUT once and returns them in registration order."""
+
+    if _panel_classes:
+        return _panel_classes
+    for label, idname, parent, icon, rows in PANEL_LAYOUT:
+        attributes = {
+            "__doc__": f"Draws UI tab for '{label}' properties.",
+            "bl_label": label,
+            "bl_idname": idname,
+            "bl_parent_id": parent,
+            "bl_options": {"DEFAULT_CLOSED"},
+            "ac_rows": rows,
+        }
+        base = PropertiesPanel
+        if icon:
+            base = PropertiesHeaderPanel
+            attributes["ac_header_icon"] = icon
+        _panel_classes.append(type(idname, (base, Panel), attributes))
+    return _panel_classes
+
+
+def armature_families(obj) -> set:
+    """Property families in the properties bone of an armature object."""
+
+    families: set = set()
+    pbone = obj.pose.bones.get(ArmaturePanel.ac_custom_bone) if obj.pose else None
+    if pbone is None:
+        return families
+    for name in pbone.keys():
+        base = split_side(name)[0]
+        families.update(family for family in ArmaturePanel.ac_families if family in base)
+    return families
+
+
+def file_families() -> set:
+    """Property families found in the properties bone of any armature in the file."""
+
+    families: set = set()
+    for obj in bpy.data.objects:
+        if obj.type == "ARMATURE":
+            families |= armature_families(obj)
+    return families
+
+
+def panels_in_use(families: set) -> list:
+    """Generated panels with rows of families, and the panels they are nested in.
+
+    :return: panel classes in registration order.
+    """
 
-    bl_label = "IK Stretch"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_IKStretchUI"
-    bl_parent_id = "VIEW3D_PT_IKSettingsUI"
+    classes = panel_classes()
+    by_idname = {cls.bl_idname: cls for cls in classes}
+    used: set = set()
+    for cls in classes:
+        if any(family in families for row in cls.ac_rows for _prop, family, _text in row):
+            panel = cls
+            while panel is not None and panel.bl_idname not in used:
+                used.add(panel.bl_idname)
+                panel = by_idname.get(panel.bl_parent_id)
+    return [cls for cls in classes if cls.bl_idname in used]
 
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_ik_stretch)
-        )
 
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_ik_stretch):
-            layout = self.layout
+# Generated panels registered right now, in registration order.
+_registered: list = []
+# Families of the last sync.
+_families: set = set()
 
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ik_stretch}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_stretch,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Arm IK",
-                split=split,
-            )
 
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_ik_stretch}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_stretch,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Arm IK",
-                split=split,
-            )
+def sync_panels() -> None:
+    """Registers the generated panels the file uses and unregisters the others.
 
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ik_stretch}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_stretch,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Left Leg IK",
-                split=split,
-            )
+    Only the panels that change are registered or unregistered, children before
+    their parents when unregistering.
+    """
 
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_ik_stretch}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_ik_stretch,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Right Leg IK",
-                split=split,
-            )
+    families = file_families()
+    wanted = panels_in_use(families)
+    for cls in reversed(_registered):
+        if cls not in wanted:
+            unregister_class(cls)
+    for cls in wanted:
+        if cls not in _registered:
+            register_class(cls)
+    _registered[:] = wanted
+    _families.clear()
+    _families.update(families)
 
 
-# ----- Main Panel -----
-class VIEW3D_PT_FaceSettingsUI(ArmaturePanel, Panel):
-    """ Draws main UI tab for 'Face Settings' properties. A child of 'Custom Properties Settings' Tab. """
+def _sync_timer() -> None:
+    sync_panels()
+    return None
 
-    bl_label = "Face Settings"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_FaceSettingsUI"
-    bl_parent_id = "VIEW3D_PT_CustomBonePropertiesUI"
 
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return super().poll(context) and super().is_bone(cls.ac_custom_bone, context)
+def schedule_sync() -> None:
+    """Runs sync_panels from a timer, registering classes inside handlers isn't safe."""
 
-    def draw_header(self, context: Context):
-        layout = self.layout
-        layout.label(icon="COLLAPSEMENU")
+    if not bpy.app.timers.is_registered(_sync_timer):
+        bpy.app.timers.register(_sync_timer, first_interval=0.0, persistent=True)
 
-    def draw(self, context: Context):
-        pass
 
+@persistent
+def on_load(*args) -> None:
+    schedule_sync()
 
-class VIEW3D_PT_MouthPropUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'Mouth Settings' properties. A child of 'Character Properties' Tab. """
 
-    bl_label = "Mouth Settings"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_MouthPropUI"
-    bl_parent_id = "VIEW3D_PT_FaceSettingsUI"
-    ac_custom_bone = "Properties"
+@persistent
+def on_depsgraph_update(scene, depsgraph) -> None:
+    """Syncs again when an updated armature has a family without panels, e.g. after
+    properties were added. Panels of removed families stay until the next file load."""
 
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_mouth_zip)
-        )
+    for update in depsgraph.updates:
+        obj = update.id
+        if isinstance(obj, bpy.types.Object) and obj.type == "ARMATURE":
+            if not armature_families(obj.original) <= _families:
+                schedule_sync()
+                return
 
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_mouth_zip):
-            layout = self.layout
-            split = layout.split()
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"mouth{self.ac_mouth_zip}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_mouth_zip,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Mouth Zipper",
-                split=split,
-            )
 
-        if custom_prop := super().is_custom_property(
-            property_name=f"teeth{self.ac_teeth_follow}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_teeth_follow,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Teeth Follow Mouth",
-                split=split,
-            )
+handlers: tuple = (
+    (bpy.app.handlers.load_post, on_load),
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+)
 
 
-class VIEW3D_PT_EyesPropUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'Eyes Settings' properties. A child of 'Character Properties' Tab. """
+def register_panels() -> None:
+    """Generated panels are registered by the first sync, the file isn't readable yet
+    while the add-on registers."""
 
-    bl_label = "Eyes Settings"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_EyesPropUI"
-    bl_parent_id = "VIEW3D_PT_FaceSettingsUI"
-    ac_custom_bone = "Properties"
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
+    schedule_sync()
 
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_sticky_eye)
-        )
 
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_sticky_eye):
-            layout = self.layout
-            split = layout.split()
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"eyes{self.ac_sticky_eye}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_sticky_eye,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop,
-                context=context,
-                text="Sticky Eyelips",
-                split=split,
-            )
+def unregister_panels() -> None:
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
+    if bpy.app.timers.is_registered(_sync_timer):
+        bpy.app.timers.unregister(_sync_timer)
+    for cls in reversed(_registered):
+        unregister_class(cls)
+    _registered.clear()
+    _families.clear()
 
 
-# ----- Main Panel -----
-class VIEW3D_PT_CharacterSettingsUI(ArmaturePanel, Panel):
-    """ Draws main tab for all properties under the label 'Character Properties'. """
+class VIEW3D_PT_RedrawProfileUI(Panel):
+    """Slowest panel methods while the redraw profiler runs."""
 
-    bl_label = "Character Properties"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_CharacterSettingsUI"
+    bl_label = "Redraw Profile"
+    bl_idname = "VIEW3D_PT_RedrawProfileUI"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Rigging Toolkit"
 
     @classmethod
     def poll(cls, context: Context) -> bool:
-        return super().poll(context)
+        return redraw_profiler.is_enabled()
 
     def draw(self, context: Context):
         layout = self.layout
+        total = redraw_profiler.redraw_ms()
         layout.label(
-            text=f"{context.active_object.name}",
-            icon="OUTLINER_OB_ARMATURE",
-        )
-
-
-class VIEW3D_PT_BonesMaskPropUI(ArmaturePanel, Panel):
-    """ Draws UI tab for 'Mask Settings' properties. A child of 'Character Properties' Tab. """
-
-    bl_label = "Mask Settings"
-    bl_options = {"DEFAULT_CLOSED"}
-    bl_idname = "VIEW3D_PT_BonesMaskPropUI"
-    bl_parent_id = "VIEW3D_PT_CharacterSettingsUI"
-
-    @classmethod
-    def poll(cls, context: Context) -> bool:
-        return (
-            super().poll(context)
-            and super().is_bone(cls.ac_custom_bone, context)
-            # and super().is_custom_suffix(cls.ac_custom_bone, context, cls.ac_mask_prop)
+            text=f"{total:.3f} ms per redraw, budget {redraw_profiler.BUDGET_MS:.1f} ms",
+            icon="ERROR" if total > redraw_profiler.BUDGET_MS else "CHECKMARK",
         )
-
-    def draw_header(self, context: Context):
-        layout = self.layout
-        layout.label(icon="MOD_MASK")
-
-    def draw(self, context: Context):
-        if self.is_custom_suffix(self.ac_custom_bone, context, self.ac_mask_prop):
-            layout = self.layout
-            split = layout.split()
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_mask_prop}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_mask_prop,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Arm", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"arm{self.ac_mask_prop}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_mask_prop,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Arm", split=split
-            )
-
-            # New split of pair columns
-            split = layout.split()
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_mask_prop}{self.ac_side['left']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_mask_prop,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Left Leg", split=split
-            )
-
-        if custom_prop := super().is_custom_property(
-            property_name=f"leg{self.ac_mask_prop}{self.ac_side['right']}",
-            source_bone=self.ac_custom_bone,
-            context=context,
-            property_suffix=self.ac_mask_prop,
-        ):
-            super().draw_custom_property(
-                custom_prop=custom_prop, context=context, text="Right Leg", split=split
-            )
+        col = layout.column(align=True)
+        for panel, method, mean_ms, max_ms, _count in redraw_profiler.worst(8):
+            row = col.row()
+            row.label(text=f"{panel}.{method}")
+            row.label(text=f"{mean_ms:.3f} / {max_ms:.3f} ms")
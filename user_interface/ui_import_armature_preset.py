@@ -1,3 +1,35 @@
+from bpy.types import Context, Menu
+from ..operators import preset_catalogue
+
+
+class VIEW3D_MT_ArmaturePresets(Menu):
+    """Every armature and collection of the preset files, to append or link."""
+
+    bl_label = "Armature Presets"
+    bl_idname = "VIEW3D_MT_ArmaturePresets"
+
+    def draw(self, context: Context):
+        layout = self.layout
+        for filename, preset in preset_catalogue.catalogue().items():
+            layout.label(text=filename.removesuffix('.blend'))
+            for kind, icon, names in (
+                ("OBJECT", "ARMATURE_DATA", preset["armatures"]),
+                ("COLLECTION", "OUTLINER_COLLECTION", preset["collections"]),
+            ):
+                for name in names:
+                    for link in (False, True):
+                        op = layout.operator(
+                            "rigtoolkit.human_armature_preset",
+                            text=f"{name} (Link)" if link else name,
+                            icon="LINKED" if link else icon,
+                        )
+                        op.filename = filename
+                        op.name = name
+                        op.kind = kind
+                        op.link = link
+            layout.separator()
+
+
 def DATA_MT_HumanArmaturePreset(self, context):
     layout = self.layout
     col = layout.column(align=True)
@@ -6,3 +38,4 @@ def DATA_MT_HumanArmaturePreset(self, context):
         text="Human Armature Preset",
         icon="ARMATURE_DATA",
     )
+    col.menu("VIEW3D_MT_ArmaturePresets", icon="ASSET_MANAGER")
@@ -0,0 +1,96 @@
+"""Prepares the widget index and reads the libraries in small slices after the add-on registers.
+
+The first chain operator would otherwise pay for indexing the widgets of the file and
+reading the widget names of widgets.blend, and the first preset import for opening the
+preset files. register() schedules run_slice with bpy.app.timers, and every file load
+schedules it again since loading drops the widget index. The warm-up only fills caches,
+it doesn't add anything to the file: widget meshes are built by set_bone.widgets() when
+a rig module needs them.
+
+Work is split in units: the widget index, the names of widgets.blend, or one preset
+file. A slice runs units until SLICE_SECONDS have passed, checked between units, so a
+unit isn't cut short. Reading a library is one library load that can take longer than
+a slice on its own, it always ends its slice.
+"""
+
+import time
+import bpy
+from bpy.app.handlers import persistent
+from .rig_modules import set_bone
+from .operators import preset_catalogue
+
+SLICE_SECONDS = 0.005
+# Seconds between slices, and before the first one so startup isn't slowed down.
+INTERVAL = 0.1
+FIRST_DELAY = 1.0
+
+_steps = None
+
+
+def steps():
+    """Warm-up work, one unit per yield. Yields True after units that end the slice."""
+
+    set_bone.index_widgets()
+    yield False
+    set_bone.library_widget_names()
+    yield True
+    for path in preset_catalogue.preset_files():
+        if not preset_catalogue.is_indexed(path):
+            preset_catalogue.entry(path)
+            yield True
+
+
+def run_slice() -> float | None:
+    """Timer callback, returns the delay to the next slice or None when done."""
+
+    global _steps
+    if _steps is None:
+        _steps = steps()
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < SLICE_SECONDS:
+            if next(_steps):
+                break
+    except StopIteration:
+        _steps = None
+        return None
+    except Exception as error:
+        # A broken library only costs its first use the load, don't keep trying.
+        print(f"Rigging Toolkit warm-up stopped: {error}")
+        _steps = None
+        return None
+    return INTERVAL
+
+
+def schedule() -> None:
+    """Starts the warm-up over, FIRST_DELAY seconds from now. The timer is persistent,
+    so loading a file from the command line or the splash screen doesn't drop it."""
+
+    cancel()
+    bpy.app.timers.register(run_slice, first_interval=FIRST_DELAY, persistent=True)
+
+
+def cancel() -> None:
+    global _steps
+    if bpy.app.timers.is_registered(run_slice):
+        bpy.app.timers.unregister(run_slice)
+    _steps = None
+
+
+@persistent
+def on_load(*args) -> None:
+    """Loading a file clears the widget index, the new file gets its own warm-up."""
+
+    schedule()
+
+
+def register_handlers() -> None:
+    if on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(on_load)
+    schedule()
+
+
+def unregister_handlers() -> None:
+    if on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load)
+    cancel()